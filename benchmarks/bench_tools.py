@@ -0,0 +1,940 @@
+"""
+Benchmarks for the PokéProfGPT Tools methods against a local PokéAPI stand-in.
+
+The stand-in runs in its own process and replays recorded PokéAPI responses ("fixtures"), optionally adding
+latency, jitter and injected errors. It counts the requests and bytes each tool call causes. Every Tools method
+runs over a fixed corpus, including the worst cases: Mew's movelist, Eevee's branching evolution chain and
+Pikachu's forms. The report gives p50/p95/p99 latency, time to first streamed section, render time, upstream
+requests, new connections (handshakes), bytes and peak memory. The results are compared with a stored baseline.
+More requests, bytes, errors or output than the baseline make the run exit with status 1; slower timings and
+higher peak memory are only reported, since they depend on the machine, unless --strict-timing is given.
+
+    python benchmarks/bench_tools.py record                       # once, from pokeapi.co into benchmarks/fixtures
+    python benchmarks/bench_tools.py run                          # compare against benchmarks/baseline.json
+    python benchmarks/bench_tools.py run --latency 40 --jitter 20 --error-rate 0.05
+    python benchmarks/bench_tools.py run --update-baseline        # accept the current numbers
+    python benchmarks/bench_tools.py run --strict-timing          # also fail on slowdowns (same-machine baseline)
+
+"--synthetic" replaces the recorded fixtures with generated responses. They have PokéAPI's shape but made-up
+content, so it works without network access. Only compare synthetic runs with synthetic baselines.
+"""
+
+import argparse
+import asyncio
+import gc
+import gzip
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(BENCHMARKS_DIR), "source"))
+
+import pokeprofgpt_tool as pokeprof  # noqa: E402
+
+DEFAULT_FIXTURES_PATH = os.path.join(BENCHMARKS_DIR, "fixtures")
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARKS_DIR, "baseline.json")
+API_PREFIX = "/api/v2/"
+CONTROL_PREFIX = "/__bench/"
+
+# (case, Tools method, arguments, Valve overrides). Mew has the largest movelist, Eevee the most branched
+# evolution chain and Pikachu the most forms; the unbudgeted movelist is the worst case for output size.
+CORPUS = (
+    ("details/pikachu", "get_pokemon_details", {"pokemon_name": "pikachu"}, {}),
+    ("details/pikachu+forms", "get_pokemon_details", {"pokemon_name": "pikachu", "include_forms": True}, {}),
+    ("details/eevee", "get_pokemon_details", {"pokemon_name": "eevee"}, {}),
+    ("details/mew", "get_pokemon_details", {"pokemon_name": "Mew"}, {}),
+    ("details/pikachu+forms-streamed", "get_pokemon_details", {"pokemon_name": "pikachu", "include_forms": True}, {"stream_details": True}),
+    ("team/eeveelutions", "get_team_details", {"pokemon_names": ["eevee", "vaporeon", "jolteon", "flareon", "espeon", "umbreon"]}, {}),
+    ("team/mixed", "get_team_details", {"pokemon_names": ["pikachu", "charizard", "venusaur", "mew", "sylveon", "pichu"]}, {}),
+    ("movelist/mew", "get_pokemon_movelist", {"pokemon_name": "mew"}, {}),
+    ("movelist/mew-unbudgeted", "get_pokemon_movelist", {"pokemon_name": "mew"}, {"movelist_max_tokens": 0}),
+    ("movelist/mew-gen3-level-up", "get_pokemon_movelist", {"pokemon_name": "mew", "generation": "3", "learn_method": "level-up"}, {}),
+    ("movelist/pikachu-emerald", "get_pokemon_movelist", {"pokemon_name": "pikachu", "version_group": "emerald"}, {}),
+    ("ability/static", "get_ability_details", {"ability_name": "static"}, {}),
+    ("location/pikachu", "get_pokemon_location", {"pokemon_name": "pikachu"}, {}),
+    ("egg-group/field", "get_egg_groups", {"egg_group_name": "field"}, {}),
+    ("item/leftovers", "get_item", {"item_name": "leftovers"}, {}),
+    ("move-learners/thunderbolt", "get_move_learners", {"move_name": "thunderbolt"}, {}),
+    ("location-encounters/viridian-forest", "get_location_encounters", {"location_name": "Viridian Forest"}, {}),
+    ("type/electric", "get_pokemon_by_type", {"type_name": "electric"}, {}),
+    ("matchups/fire-flying", "get_type_matchups", {"type_names": ["Fire", "Flying"]}, {}),
+    ("coverage/thunderbolt-ice-beam-surf", "get_movepool_coverage", {"move_names": ["Thunderbolt", "Ice Beam", "Surf", "Thunder Wave"]}, {}),
+    ("team-coverage/mixed", "get_team_coverage", {"pokemon_names": ["pikachu", "charizard", "venusaur", "vaporeon", "umbreon", "sylveon"]}, {}),
+)
+
+# Pokémon covered by the reverse lookup index during the benchmark (the real index covers every Pokémon)
+INDEXED_POKEMON = (
+    "pichu", "pikachu", "raichu", "eevee", "vaporeon", "jolteon", "flareon", "espeon", "umbreon",
+    "leafeon", "glaceon", "sylveon", "mew", "bulbasaur", "ivysaur", "venusaur", "charmander", "charmeleon", "charizard",
+)
+
+
+class FixtureStore:
+    """
+    Recorded PokéAPI responses: one gzip file per endpoint plus a manifest describing where they came from.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _file(self, endpoint: str) -> str:
+        return os.path.join(self.path, urllib.parse.quote(endpoint, safe="") + ".json.gz")
+
+    def save(self, endpoint: str, body: bytes):
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._file(endpoint), "wb") as handle:
+            handle.write(gzip.compress(body, mtime=0))
+
+    def write_manifest(self, source: str):
+        with open(os.path.join(self.path, "manifest.json"), "w") as handle:
+            json.dump({"source": source, "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds")}, handle, indent=2)
+
+    def load(self):
+        """
+        :return: Tuple of (endpoint to raw JSON body, manifest dictionary).
+        """
+        with open(os.path.join(self.path, "manifest.json")) as handle:
+            manifest = json.load(handle)
+        fixtures = {}
+        for file_name in os.listdir(self.path):
+            if file_name.endswith(".json.gz"):
+                with open(os.path.join(self.path, file_name), "rb") as handle:
+                    fixtures[urllib.parse.unquote(file_name[:-len(".json.gz")])] = gzip.decompress(handle.read())
+        return fixtures, manifest
+
+
+def fixtures_digest(fixtures: dict) -> str:
+    digest = hashlib.sha256()
+    for endpoint in sorted(fixtures):
+        digest.update(endpoint.encode())
+        digest.update(hashlib.sha256(fixtures[endpoint]).digest())
+    return digest.hexdigest()[:16]
+
+
+# Synthetic corpus: PokéAPI-shaped responses for the benchmark corpus, sized like the real ones
+# (a full sprites block, game indices and a version group entry per game a move is learnable in).
+
+VERSION_GROUPS = (
+    ("red-blue", 1), ("yellow", 1), ("gold-silver", 2), ("crystal", 2), ("ruby-sapphire", 3), ("emerald", 3),
+    ("firered-leafgreen", 3), ("colosseum", 3), ("xd", 3), ("diamond-pearl", 4), ("platinum", 4),
+    ("heartgold-soulsilver", 4), ("black-white", 5), ("black-2-white-2", 5), ("x-y", 6),
+    ("omega-ruby-alpha-sapphire", 6), ("sun-moon", 7), ("ultra-sun-ultra-moon", 7),
+    ("lets-go-pikachu-lets-go-eevee", 7), ("sword-shield", 8), ("the-isle-of-armor", 8), ("the-crown-tundra", 8),
+    ("brilliant-diamond-and-shining-pearl", 8), ("legends-arceus", 8), ("scarlet-violet", 9), ("the-teal-mask", 9),
+    ("the-indigo-disk", 9),
+)
+# version: version group
+VERSIONS = {
+    "red": "red-blue", "blue": "red-blue", "yellow": "yellow", "gold": "gold-silver", "silver": "gold-silver",
+    "crystal": "crystal", "ruby": "ruby-sapphire", "sapphire": "ruby-sapphire", "emerald": "emerald",
+    "firered": "firered-leafgreen", "leafgreen": "firered-leafgreen", "diamond": "diamond-pearl", "pearl": "diamond-pearl",
+    "platinum": "platinum", "heartgold": "heartgold-soulsilver", "soulsilver": "heartgold-soulsilver", "black": "black-white",
+    "white": "black-white", "black-2": "black-2-white-2", "white-2": "black-2-white-2", "x": "x-y", "y": "x-y",
+    "omega-ruby": "omega-ruby-alpha-sapphire", "alpha-sapphire": "omega-ruby-alpha-sapphire", "sun": "sun-moon",
+    "moon": "sun-moon", "ultra-sun": "ultra-sun-ultra-moon", "ultra-moon": "ultra-sun-ultra-moon", "sword": "sword-shield",
+    "shield": "sword-shield", "scarlet": "scarlet-violet", "violet": "scarlet-violet",
+}
+MOVES = (
+    "thunderbolt", "thunder", "thunder-shock", "thunder-wave", "volt-tackle", "quick-attack", "iron-tail", "surf",
+    "psychic", "transform", "metronome", "ancient-power", "aura-sphere", "flamethrower", "ice-beam", "hydro-pump",
+    "solar-beam", "earthquake", "shadow-ball", "swift", "tackle", "growl", "tail-whip", "bite", "take-down",
+    "double-edge", "baby-doll-eyes", "last-resort", "moonblast", "dazzling-gleam", "dark-pulse", "leaf-blade",
+    "ice-fang", "fire-fang", "wish", "protect", "rest", "sleep-talk", "substitute", "toxic", "facade", "return",
+    "frustration", "hidden-power", "double-team", "attract", "endure", "swagger", "round", "echoed-voice",
+) + tuple(f"move-{number}" for number in range(1, 870))
+POKEMON = {
+    # name: (id, types, species id, evolution chain id, moves, abilities)
+    "bulbasaur": (1, ("grass", "poison"), 1, 1, 80, ("overgrow", "chlorophyll")),
+    "ivysaur": (2, ("grass", "poison"), 2, 1, 75, ("overgrow", "chlorophyll")),
+    "venusaur": (3, ("grass", "poison"), 3, 1, 95, ("overgrow", "chlorophyll")),
+    "charmander": (4, ("fire",), 4, 2, 85, ("blaze", "solar-power")),
+    "charmeleon": (5, ("fire",), 5, 2, 80, ("blaze", "solar-power")),
+    "charizard": (6, ("fire", "flying"), 6, 2, 110, ("blaze", "solar-power")),
+    "pikachu": (25, ("electric",), 25, 10, 105, ("static", "lightning-rod")),
+    "raichu": (26, ("electric",), 26, 10, 95, ("static", "lightning-rod")),
+    "eevee": (133, ("normal",), 133, 67, 90, ("run-away", "adaptability", "anticipation")),
+    "vaporeon": (134, ("water",), 134, 67, 95, ("water-absorb", "hydration")),
+    "jolteon": (135, ("electric",), 135, 67, 95, ("volt-absorb", "quick-feet")),
+    "flareon": (136, ("fire",), 136, 67, 95, ("flash-fire", "guts")),
+    "mew": (151, ("psychic",), 151, 77, 380, ("synchronize",)),
+    "pichu": (172, ("electric",), 172, 10, 70, ("static", "lightning-rod")),
+    "espeon": (196, ("psychic",), 196, 67, 95, ("synchronize", "magic-bounce")),
+    "umbreon": (197, ("dark",), 197, 67, 95, ("synchronize", "inner-focus")),
+    "leafeon": (470, ("grass",), 470, 67, 85, ("leaf-guard", "chlorophyll")),
+    "glaceon": (471, ("ice",), 471, 67, 85, ("snow-cloak", "ice-body")),
+    "sylveon": (700, ("fairy",), 700, 67, 85, ("cute-charm", "pixilate")),
+}
+TYPE_CHART = {
+    # attacking type: (super effective against, not very effective against, no effect on)
+    "normal": ((), ("rock", "steel"), ("ghost",)),
+    "fighting": (("normal", "ice", "rock", "dark", "steel"), ("poison", "flying", "psychic", "bug", "fairy"), ("ghost",)),
+    "flying": (("grass", "fighting", "bug"), ("electric", "rock", "steel"), ()),
+    "poison": (("grass", "fairy"), ("poison", "ground", "rock", "ghost"), ("steel",)),
+    "ground": (("fire", "electric", "poison", "rock", "steel"), ("grass", "bug"), ("flying",)),
+    "rock": (("fire", "ice", "flying", "bug"), ("fighting", "ground", "steel"), ()),
+    "bug": (("grass", "psychic", "dark"), ("fire", "fighting", "poison", "flying", "ghost", "steel", "fairy"), ()),
+    "ghost": (("psychic", "ghost"), ("dark",), ("normal",)),
+    "steel": (("ice", "rock", "fairy"), ("fire", "water", "electric", "steel"), ()),
+    "fire": (("grass", "ice", "bug", "steel"), ("fire", "water", "rock", "dragon"), ()),
+    "water": (("fire", "ground", "rock"), ("water", "grass", "dragon"), ()),
+    "grass": (("water", "ground", "rock"), ("fire", "grass", "poison", "flying", "bug", "dragon", "steel"), ()),
+    "electric": (("water", "flying"), ("electric", "grass", "dragon"), ("ground",)),
+    "psychic": (("fighting", "poison"), ("psychic", "steel"), ("dark",)),
+    "ice": (("grass", "ground", "flying", "dragon"), ("fire", "water", "ice", "steel"), ()),
+    "dragon": (("dragon",), ("steel",), ("fairy",)),
+    "dark": (("psychic", "ghost"), ("fighting", "dark", "fairy"), ()),
+    "fairy": (("fighting", "dragon", "dark"), ("fire", "poison", "steel"), ()),
+    # Listed by PokéAPI without damage relations
+    "stellar": ((), (), ()),
+    "unknown": ((), (), ()),
+    "shadow": ((), (), ()),
+}
+MOVE_DETAILS = {
+    # name: (type, damage class)
+    "thunderbolt": ("electric", "special"), "ice-beam": ("ice", "special"), "surf": ("water", "special"),
+    "thunder-wave": ("electric", "status"),
+}
+PIKACHU_FORMS = (
+    "pikachu", "pikachu-rock-star", "pikachu-belle", "pikachu-pop-star", "pikachu-phd", "pikachu-libre",
+    "pikachu-cosplay", "pikachu-original-cap", "pikachu-hoenn-cap", "pikachu-sinnoh-cap", "pikachu-unova-cap",
+    "pikachu-kalos-cap", "pikachu-alola-cap", "pikachu-partner-cap", "pikachu-world-cap", "pikachu-gmax",
+)
+EVOLUTIONS = {
+    # chain id: nested (species, evolution details, [evolutions])
+    1: ("bulbasaur", {}, [("ivysaur", {"trigger": "level-up", "min_level": 16}, [("venusaur", {"trigger": "level-up", "min_level": 32}, [])])]),
+    2: ("charmander", {}, [("charmeleon", {"trigger": "level-up", "min_level": 16}, [("charizard", {"trigger": "level-up", "min_level": 36}, [])])]),
+    10: ("pichu", {}, [("pikachu", {"trigger": "level-up", "min_happiness": 220}, [("raichu", {"trigger": "use-item", "item": "thunder-stone"}, [])])]),
+    67: ("eevee", {}, [
+        ("vaporeon", {"trigger": "use-item", "item": "water-stone"}, []),
+        ("jolteon", {"trigger": "use-item", "item": "thunder-stone"}, []),
+        ("flareon", {"trigger": "use-item", "item": "fire-stone"}, []),
+        ("espeon", {"trigger": "level-up", "min_happiness": 160, "time_of_day": "day"}, []),
+        ("umbreon", {"trigger": "level-up", "min_happiness": 160, "time_of_day": "night"}, []),
+        ("leafeon", {"trigger": "use-item", "item": "leaf-stone"}, []),
+        ("glaceon", {"trigger": "use-item", "item": "ice-stone"}, []),
+        ("sylveon", {"trigger": "level-up", "min_affection": 2, "known_move_type": "fairy"}, []),
+    ]),
+    77: ("mew", {}, []),
+}
+ENCOUNTERS = {
+    "pikachu": (("viridian-forest-area", ("red", "blue", "yellow", "firered", "leafgreen")), ("power-plant-area", ("red", "blue", "yellow")),
+                ("kanto-route-2-area", ("yellow",)), ("trophy-garden-area", ("diamond", "pearl", "platinum"))),
+    "pichu": (("kanto-route-2-area", ("gold", "silver")),),
+    "eevee": (("celadon-city-area", ("red", "blue", "yellow")),),
+    "bulbasaur": (("pallet-town-area", ("red", "blue")),),
+    "charmander": (("pallet-town-area", ("red", "blue")),),
+}
+
+
+def resource_url(kind: str, name: str, number: int = 1) -> dict:
+    return {"name": name, "url": f"https://pokeapi.co/api/v2/{kind}/{number}/"}
+
+
+def english(text: str, key: str = "flavor_text") -> list:
+    return [{key: text, "language": resource_url("language", language)} for language in ("ja", "en", "fr", "de")]
+
+
+def synthetic_sprites(name: str, number: int) -> dict:
+    base = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon"
+    sprites = {key: f"{base}/{part}{number}.png" for key, part in (
+        ("back_default", "back/"), ("back_shiny", "back/shiny/"), ("front_default", ""), ("front_shiny", "shiny/"))}
+    sprites.update({"back_female": None, "back_shiny_female": None, "front_female": None, "front_shiny_female": None})
+    sprites["other"] = {style: {"front_default": f"{base}/other/{style}/{number}.png", "front_shiny": f"{base}/other/{style}/shiny/{number}.png"}
+                        for style in ("dream_world", "home", "official-artwork", "showdown")}
+    sprites["versions"] = {
+        f"generation-{numeral}": {game: dict(sprites_of_game) for game in games}
+        for numeral, games, sprites_of_game in [
+            (numeral, games, {key: f"{base}/versions/generation-{numeral}/{key}/{name}.png" for key in (
+                "back_default", "back_gray", "back_shiny", "front_default", "front_gray", "front_shiny", "front_transparent")})
+            for numeral, games in (("i", ("red-blue", "yellow")), ("ii", ("crystal", "gold", "silver")),
+                                   ("iii", ("emerald", "firered-leafgreen", "ruby-sapphire")), ("iv", ("diamond-pearl", "heartgold-soulsilver", "platinum")),
+                                   ("v", ("black-white",)), ("vi", ("omegaruby-alphasapphire", "x-y")), ("vii", ("icons", "ultra-sun-ultra-moon")), ("viii", ("icons",)))
+        ]
+    }
+    return sprites
+
+
+def synthetic_moves(rng: random.Random, count: int) -> list:
+    moves = []
+    for move_number in rng.sample(range(len(MOVES)), count) if count < len(MOVES) else range(len(MOVES)):
+        details = []
+        for version_group, _ in VERSION_GROUPS:
+            if rng.random() < 0.6:
+                method = rng.choice(("level-up", "level-up", "machine", "machine", "egg", "tutor"))
+                details.append({
+                    "level_learned_at": rng.randint(1, 80) if method == "level-up" else 0,
+                    "move_learn_method": resource_url("move-learn-method", method),
+                    "order": None,
+                    "version_group": resource_url("version-group", version_group),
+                })
+        if details:
+            moves.append({"move": resource_url("move", MOVES[move_number], move_number + 1), "version_group_details": details})
+    return moves
+
+
+def synthetic_evolution_node(node: tuple) -> dict:
+    species, details, evolutions = node
+    evolution_details = []
+    if details:
+        detail = {key: None for key in ("gender", "held_item", "item", "known_move", "known_move_type", "location", "min_affection",
+                                        "min_beauty", "min_happiness", "min_level", "party_species", "party_type", "relative_physical_stats",
+                                        "trade_species")}
+        detail.update({"needs_overworld_rain": False, "time_of_day": "", "turn_upside_down": False})
+        for key, value in details.items():
+            detail[key] = resource_url(key.replace("_", "-"), value) if key in ("trigger", "item", "known_move_type") else value
+        evolution_details.append(detail)
+    return {
+        "evolution_details": evolution_details,
+        "evolves_to": [synthetic_evolution_node(evolution) for evolution in evolutions],
+        "is_baby": species == "pichu",
+        "species": resource_url("pokemon-species", species),
+    }
+
+
+def synthetic_fixtures(seed: int = 151) -> dict:
+    """
+    Generate PokéAPI-shaped responses for every endpoint the corpus touches. The content is made up.
+    :return: Mapping of endpoint to raw JSON body.
+    """
+    rng = random.Random(seed)
+    responses = {}
+    filler = [f"pokemon-{number}" for number in range(1, 1300 - len(POKEMON))]
+    listings = {
+        "pokemon": list(POKEMON) + list(PIKACHU_FORMS[1:]) + filler,
+        "pokemon-species": list(POKEMON) + filler[:1000],
+        "ability": sorted({ability for *_, abilities in POKEMON.values() for ability in abilities}) + [f"ability-{number}" for number in range(300)],
+        "item": ["leftovers", "thunder-stone", "water-stone", "fire-stone", "leaf-stone", "ice-stone"] + [f"item-{number}" for number in range(2100)],
+        "move": list(MOVES),
+        "egg-group": ["monster", "water1", "bug", "flying", "ground", "fairy", "plant", "humanshape", "water3", "mineral",
+                      "indeterminate", "water2", "ditto", "dragon", "no-eggs"],
+        "version": list(VERSIONS),
+        "type": list(TYPE_CHART),
+    }
+    for kind, names in listings.items():
+        responses[f"{kind}?limit=100000"] = {"count": len(names), "next": None, "previous": None,
+                                             "results": [resource_url(kind, name, number) for number, name in enumerate(names, 1)]}
+
+    for name, (number, types, species_number, chain, move_count, abilities) in POKEMON.items():
+        forms = PIKACHU_FORMS if name == "pikachu" else (name,)
+        responses[f"pokemon/{name}"] = {
+            "abilities": [{"ability": resource_url("ability", ability), "is_hidden": slot == len(abilities), "slot": slot}
+                          for slot, ability in enumerate(abilities, 1)],
+            "base_experience": 112,
+            "cries": {"latest": f"https://raw.githubusercontent.com/PokeAPI/cries/main/cries/pokemon/latest/{number}.ogg", "legacy": None},
+            "forms": [resource_url("pokemon-form", form, 10000 + index) for index, form in enumerate(forms)],
+            "game_indices": [{"game_index": number, "version": resource_url("version", version)} for version in list(VERSIONS)[:20]],
+            "height": rng.randint(3, 20),
+            "held_items": [],
+            "id": number,
+            "is_default": True,
+            "location_area_encounters": f"https://pokeapi.co/api/v2/pokemon/{number}/encounters",
+            "moves": synthetic_moves(rng, move_count),
+            "name": name,
+            "order": number,
+            "past_abilities": [],
+            "past_types": [],
+            "species": resource_url("pokemon-species", name, species_number),
+            "sprites": synthetic_sprites(name, number),
+            "stats": [{"base_stat": rng.randint(35, 130), "effort": 0, "stat": resource_url("stat", stat)}
+                      for stat in ("hp", "attack", "defense", "special-attack", "special-defense", "speed")],
+            "types": [{"slot": slot, "type": resource_url("type", type_name)} for slot, type_name in enumerate(types, 1)],
+            "weight": rng.randint(20, 1000),
+        }
+        responses[f"pokemon-species/{name}"] = {
+            "base_happiness": 50, "capture_rate": 45, "color": resource_url("pokemon-color", "yellow"),
+            "egg_groups": [resource_url("egg-group", "ground"), resource_url("egg-group", "fairy")],
+            "evolution_chain": {"url": f"https://pokeapi.co/api/v2/evolution-chain/{chain}/"},
+            "flavor_text_entries": [entry | {"version": resource_url("version", version)}
+                                    for version in VERSIONS for entry in english(f"{name} flavor text from {version}. " * 3)],
+            "genera": english(f"{name} Pokémon", "genus"),
+            "id": species_number, "is_baby": name == "pichu", "is_legendary": False, "is_mythical": name == "mew",
+            "name": name, "names": english(name.title(), "name"),
+            "varieties": [{"is_default": True, "pokemon": resource_url("pokemon", name, number)}],
+        }
+        responses[f"pokemon/{name}/encounters"] = [
+            {"location_area": resource_url("location-area", area), "version_details": [
+                {"encounter_details": [{"chance": 5, "condition_values": [], "max_level": 6, "method": resource_url("encounter-method", "walk"),
+                                        "min_level": 3}], "max_chance": 5, "version": resource_url("version", version)}
+                for version in versions]}
+            for area, versions in ENCOUNTERS.get(name, ())
+        ]
+        for form in forms:
+            responses[f"pokemon-form/{form}"] = {
+                "form_name": form.replace(f"{name}-", "") if form != name else "", "id": number, "is_battle_only": form.endswith("gmax"),
+                "is_default": form == name, "is_mega": False, "name": form, "pokemon": resource_url("pokemon", name, number),
+                "sprites": {key: value for key, value in synthetic_sprites(form, number).items() if key.startswith(("front", "back"))},
+                "types": [{"slot": slot, "type": resource_url("type", type_name)} for slot, type_name in enumerate(types, 1)],
+                "version_group": resource_url("version-group", "sword-shield"),
+            }
+    for chain, root in EVOLUTIONS.items():
+        responses[f"evolution-chain/{chain}"] = {"baby_trigger_item": None, "chain": synthetic_evolution_node(root), "id": chain}
+    for number, (version, version_group) in enumerate(VERSIONS.items(), 1):
+        responses[f"version/{version}"] = {"id": number, "name": version, "names": english(version.replace("-", " ").title(), "name"),
+                                           "version_group": resource_url("version-group", version_group)}
+    for generation in range(1, 10):
+        responses[f"generation/{generation}"] = {
+            "id": generation, "name": f"generation-{generation}",
+            "version_groups": [resource_url("version-group", group) for group, number in VERSION_GROUPS if number == generation],
+        }
+    responses["ability/static"] = {
+        "effect_entries": english("Whenever a move makes contact with this Pokémon, the move's user has a 30% chance of being paralyzed.", "effect"),
+        "name": "static",
+        "pokemon": [{"is_hidden": False, "pokemon": resource_url("pokemon", name), "slot": 1} for name in ("pikachu", "raichu", "pichu")]
+                   + [{"is_hidden": False, "pokemon": resource_url("pokemon", name), "slot": 1} for name in filler[:20]],
+    }
+    for number, (name, (double, half, none)) in enumerate(TYPE_CHART.items(), 1):
+        relations = {f"{relation}_to": [resource_url("type", target) for target in targets]
+                     for relation, targets in (("double_damage", double), ("half_damage", half), ("no_damage", none))}
+        for relation, index in (("double_damage", 0), ("half_damage", 1), ("no_damage", 2)):
+            relations[f"{relation}_from"] = [resource_url("type", attacker) for attacker, chart in TYPE_CHART.items() if name in chart[index]]
+        responses[f"type/{name}"] = {
+            "damage_relations": relations, "id": number, "name": name,
+            "moves": [resource_url("move", move) for move in MOVES[number::len(TYPE_CHART)]],
+            "pokemon": [{"pokemon": resource_url("pokemon", pokemon), "slot": types.index(name) + 1}
+                        for pokemon, (_, types, *_) in POKEMON.items() if name in types],
+        }
+    for number, (name, (type_name, damage_class)) in enumerate(MOVE_DETAILS.items(), 1):
+        responses[f"move/{name}"] = {
+            "accuracy": 100, "damage_class": resource_url("move-damage-class", damage_class), "id": number, "name": name,
+            "power": None if damage_class == "status" else 90, "pp": 15, "priority": 0, "type": resource_url("type", type_name),
+            "effect_entries": [{"effect": "Inflicts regular damage.", "language": resource_url("language", "en"), "short_effect": "Inflicts regular damage."}],
+            "learned_by_pokemon": [resource_url("pokemon", pokemon) for pokemon in POKEMON],
+        }
+    responses["egg-group/ground"] = {"id": 5, "name": "ground", "pokemon_species": [resource_url("pokemon-species", name) for name in filler[:280]]}
+    responses["item/leftovers"] = {
+        "attributes": [resource_url("item-attribute", attribute) for attribute in ("holdable", "holdable-active", "underground")],
+        "baby_trigger_for": None, "category": resource_url("item-category", "held-items"), "cost": 4000,
+        "effect_entries": [{"effect": "Held: Restores 1/16 of max HP at the end of every turn.", "language": resource_url("language", "en"),
+                            "short_effect": "Restores 1/16 max HP each turn."}],
+        "flavor_text_entries": [{"language": resource_url("language", language), "text": "An item to be held by a Pokémon.",
+                                 "version_group": resource_url("version-group", group)} for group, _ in VERSION_GROUPS for language in ("en", "fr")],
+        "fling_effect": None, "fling_power": 10,
+        "game_indices": [{"game_index": 234, "generation": resource_url("generation", f"generation-{numeral}")} for numeral in ("iii", "iv", "v", "vi", "vii")],
+        "held_by_pokemon": [{"pokemon": resource_url("pokemon", "snorlax"), "version_details": [{"rarity": 100, "version": resource_url("version", "red")}]}],
+        "id": 211, "name": "leftovers", "names": english("Leftovers", "name"),
+        "sprites": {"default": "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/items/leftovers.png"},
+    }
+    return {endpoint: json.dumps(data).encode() for endpoint, data in responses.items()}
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Serves fixtures under /api/v2/ like PokéAPI (gzip, ETag, 304) with injected latency, jitter and errors.
+    In record mode, endpoints missing from the fixtures are fetched from the upstream API and saved.
+    Counters are read and reset through /__bench/stats.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, fixtures: dict, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, seed: int = 0, upstream: str = None, store: FixtureStore = None):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.fixtures = {}
+        for endpoint, body in fixtures.items():
+            self.add_fixture(endpoint, body)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.upstream = upstream
+        self.store = store
+        self.lock = threading.Lock()
+        self.reset()
+
+    def add_fixture(self, endpoint: str, body: bytes):
+        self.fixtures[endpoint] = (body, gzip.compress(body, mtime=0), f'"{hashlib.md5(body).hexdigest()}"')
+
+    def reset(self):
+        self.counters = {"requests": 0, "bytes": 0, "errors_injected": 0, "not_modified": 0, "missing": [], "endpoints": {}}
+
+    def record(self, endpoint: str):
+        # The transport asks for gzip itself; urllib does not, so PokéAPI answers uncompressed here
+        request = urllib.request.Request(f"{self.upstream}/{endpoint}", headers={"User-Agent": "pokeprofgpt-benchmarks"})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                body = response.read()
+        except OSError:
+            return None
+        self.store.save(endpoint, body)
+        with self.lock:
+            self.add_fixture(endpoint, body)
+            return self.fixtures[endpoint]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, delayed ACKs add ~40 ms to every response
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status: int, body: bytes = b"", headers: dict = None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        if self.path.startswith(CONTROL_PREFIX):
+            with server.lock:
+                body = json.dumps(server.counters).encode()
+                if "reset" in self.path:
+                    server.reset()
+            self.send(200, body, {"Content-Type": "application/json"})
+            return
+        if not self.path.startswith(API_PREFIX):
+            self.send(404, b"Not Found")
+            return
+
+        endpoint = self.path[len(API_PREFIX):].rstrip("/")
+        with server.lock:
+            server.counters["requests"] += 1
+            server.counters["endpoints"][endpoint] = server.counters["endpoints"].get(endpoint, 0) + 1
+            delay = server.latency + server.random.uniform(0, server.jitter)
+            failing = server.random.random() < server.error_rate
+        time.sleep(delay)
+        if failing:
+            with server.lock:
+                server.counters["errors_injected"] += 1
+            self.send(server.error_status, b"Injected error")
+            return
+
+        fixture = server.fixtures.get(endpoint)
+        if fixture is None and server.upstream:
+            fixture = server.record(endpoint)
+        if fixture is None:
+            with server.lock:
+                server.counters["missing"].append(endpoint)
+            self.send(404, b"Not Found")
+            return
+
+        body, compressed, etag = fixture
+        if self.headers.get("If-None-Match") == etag:
+            with server.lock:
+                server.counters["not_modified"] += 1
+            self.send(304, headers={"ETag": etag})
+            return
+        headers = {"Content-Type": "application/json; charset=utf-8", "ETag": etag}
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = compressed
+            headers["Content-Encoding"] = "gzip"
+        with server.lock:
+            server.counters["bytes"] += len(body)
+        self.send(200, body, headers)
+
+
+def serve(fixtures: dict, settings: dict, ready):
+    store = FixtureStore(settings.pop("store")) if settings.get("store") else None
+    server = StandInServer(fixtures, store=store, **settings)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+class StandIn:
+    """
+    The stand-in server running in a child process, so it does not compete with the benchmarked code for the GIL.
+    """
+
+    def __init__(self, fixtures: dict, **settings):
+        context = multiprocessing.get_context("spawn")
+        ready = context.Queue()
+        self.process = context.Process(target=serve, args=(fixtures, settings, ready), daemon=True)
+        self.process.start()
+        self.url = f"http://127.0.0.1:{ready.get(timeout=60)}"
+        self.base_url = self.url + API_PREFIX.rstrip("/")
+
+    def stats(self, reset: bool = False) -> dict:
+        with urllib.request.urlopen(f"{self.url}{CONTROL_PREFIX}stats{'?reset=1' if reset else ''}") as response:
+            return json.load(response)
+
+    def stop(self):
+        self.process.terminate()
+        self.process.join()
+
+
+def percentile(values: list, percent: float):
+    """
+    Nearest-rank percentile.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def render_seconds(tool_name: str) -> float:
+    for histogram in pokeprof.export_metrics("json")["histograms"]:
+        if histogram["name"] == "render_seconds" and histogram["labels"] == {"tool": tool_name}:
+            return histogram["sum"]
+    return 0.0
+
+
+async def measure(tools, stand_in: StandIn, method_name: str, arguments: dict, cold: bool, trace_memory: bool = False) -> dict:
+    """
+    Run one tool call and collect its measurements.
+    :param cold: Empty the response cache first so every lookup goes upstream.
+    :param trace_memory: Also record peak Python memory (slows the call down, so timings are not kept).
+    """
+    if cold:
+        pokeprof._cache.clear()
+    # Collect now so a pause for garbage left by earlier calls does not land inside this one
+    gc.collect()
+    stand_in.stats(reset=True)
+    first_section = []
+
+    async def emitter(event):
+        # Status events are progress notes; time to first section counts the first piece of the answer
+        if event.get("type") != "status" and not first_section:
+            first_section.append(time.perf_counter())
+
+    render_before = render_seconds(method_name)
+    connections_before = pokeprof.get_transport_stats()["connections"]
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        output = await getattr(tools, method_name)(**arguments, __event_emitter__=emitter)
+        error = None
+    except Exception as exception:
+        output, error = "", str(exception)
+    finished = time.perf_counter()
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    server = stand_in.stats()
+    return {
+        "seconds": finished - started,
+        "first_section_seconds": first_section[0] - started if first_section else None,
+        "render_seconds": render_seconds(method_name) - render_before,
+        "requests": server["requests"],
+        # New connections (TCP/TLS handshakes) the transport opened; the keep-alive pool should make this 0 once warmed up.
+        # A session rebuilt by a settings change restarts its counters, hence the floor
+        "connections": max(0, pokeprof.get_transport_stats()["connections"] - connections_before),
+        "bytes": server["bytes"],
+        "missing": server["missing"],
+        "peak_bytes": peak,
+        "output_chars": len(output),
+        "error": error,
+    }
+
+
+def summarize(samples: list, peak_bytes: int) -> dict:
+    def milliseconds(values, percent):
+        value = percentile([v for v in values if v is not None], percent)
+        return None if value is None else round(value * 1000, 3)
+
+    seconds = [sample["seconds"] for sample in samples]
+    first_sections = [sample["first_section_seconds"] for sample in samples]
+    return {
+        "iterations": len(samples),
+        "errors": sum(1 for sample in samples if sample["error"]),
+        "p50_ms": milliseconds(seconds, 50),
+        "p95_ms": milliseconds(seconds, 95),
+        "p99_ms": milliseconds(seconds, 99),
+        "first_section_p50_ms": milliseconds(first_sections, 50),
+        "first_section_p95_ms": milliseconds(first_sections, 95),
+        "render_p50_ms": milliseconds([sample["render_seconds"] for sample in samples], 50),
+        "requests": round(sum(sample["requests"] for sample in samples) / len(samples), 2),
+        "connections": round(sum(sample["connections"] for sample in samples) / len(samples), 2),
+        "bytes": round(sum(sample["bytes"] for sample in samples) / len(samples)),
+        "peak_kb": round(peak_bytes / 1024, 1) if peak_bytes is not None else None,
+        "output_chars": max(sample["output_chars"] for sample in samples),
+    }
+
+
+async def run_corpus(stand_in: StandIn, iterations: int, cases: tuple, trace_memory: bool = True) -> dict:
+    """
+    Run every corpus case cold (empty response cache) and warm, iterations times each.
+    Name indexes and the reverse lookup index are built before timing starts, as in a long-running worker.
+    :return: Mapping of case to {"cold": summary, "warm": summary}.
+    """
+    tools = pokeprof.Tools()
+    # The stand-in has no fair-use limit, and timings should measure the tools rather than the rate governor
+    base_valves = tools.Valves(
+        pokeapi_base_url=stand_in.base_url, cache_disk_path="", inverse_index_path="", metrics_enabled=True,
+        rate_limit_per_second=0,
+    )
+    tools.valves = base_valves
+
+    pokeprof.build_inverse_index(names=INDEXED_POKEMON)
+    # The benchmark indexes its corpus only; stop the first reverse query from starting a full background build
+    pokeprof._inverse_index.complete = True
+    pokeprof._inverse_index._update_started = True
+    for kind in pokeprof.NAME_INDEX_RESOURCES:
+        pokeprof._names.index(kind)
+
+    results = {}
+    for case, method_name, arguments, valve_overrides in cases:
+        tools.valves = base_valves.model_copy(update=valve_overrides)
+        results[case] = {}
+        for mode in ("cold", "warm"):
+            cold = mode == "cold"
+            # Untimed first call: opens connections and, when warm, fills the cache
+            await measure(tools, stand_in, method_name, arguments, cold)
+            samples = [await measure(tools, stand_in, method_name, arguments, cold) for _ in range(iterations)]
+            peak = (await measure(tools, stand_in, method_name, arguments, cold, trace_memory=True))["peak_bytes"] if trace_memory else None
+            results[case][mode] = summarize(samples, peak)
+            missing = sorted({endpoint for sample in samples for endpoint in sample["missing"]})
+            if missing:
+                results[case][mode]["missing_fixtures"] = missing
+            failures = sorted({sample["error"] for sample in samples if sample["error"]})
+            if failures:
+                results[case][mode]["error_messages"] = failures[:3]
+    tools.valves = base_valves
+    return results
+
+
+# Request counts, bytes, errors and output length repeat on any machine, so they decide whether a run fails.
+# Timings and peak memory depend on the machine and its load: they are reported as slowdowns, and only fail the
+# run with --strict-timing (useful when the baseline was recorded on the same machine).
+# Timing metrics checked for slowdowns, with the multiple of --tolerance each gets (tail latency is noisier)
+TIMING_METRICS = {"p50_ms": 1, "p95_ms": 2, "first_section_p50_ms": 1, "render_p50_ms": 1}
+# Absolute slack in milliseconds, so sub-millisecond cache hits do not fail on timer noise
+TIMING_SLACK_MS = 1.0
+
+
+def compare(results: dict, baseline: dict, tolerance: float, exact: bool = True) -> tuple:
+    """
+    :param exact: Also compare request counts, bytes and errors, which only repeat exactly without injected errors.
+    :return: Tuple of (regressions in deterministic metrics, slowdowns in timings and peak memory), both human-readable.
+    """
+    regressions = []
+    slowdowns = []
+    for case, modes in results.items():
+        for mode, current in modes.items():
+            previous = baseline.get(case, {}).get(mode)
+            if previous is None:
+                continue
+            for metric, scale in TIMING_METRICS.items():
+                if current.get(metric) is not None and previous.get(metric) is not None:
+                    limit = previous[metric] * (1 + tolerance * scale) + TIMING_SLACK_MS
+                    if current[metric] > limit:
+                        slowdowns.append(f"{case} [{mode}] {metric}: {current[metric]:.2f} ms > {previous[metric]:.2f} ms baseline")
+            # Peak memory varies with allocator state
+            if current.get("peak_kb") is not None and previous.get("peak_kb") is not None and current["peak_kb"] > previous["peak_kb"] * (1 + tolerance) + 16:
+                slowdowns.append(f"{case} [{mode}] peak_kb: {current['peak_kb']} > {previous['peak_kb']} baseline")
+            # Output length varies slightly with set ordering (e.g., which flavor text comes first)
+            if current["output_chars"] > previous["output_chars"] * (1 + tolerance):
+                regressions.append(f"{case} [{mode}] output_chars: {current['output_chars']} > {previous['output_chars']} baseline")
+            for metric in ("requests", "bytes", "errors") if exact else ():
+                if current[metric] > previous[metric]:
+                    regressions.append(f"{case} [{mode}] {metric}: {current[metric]} > {previous[metric]} baseline")
+            if previous.get("first_section_p50_ms") is not None and current.get("first_section_p50_ms") is None:
+                regressions.append(f"{case} [{mode}] no longer streams a first section")
+    return regressions, slowdowns
+
+
+def print_report(results: dict):
+    def cell(value, digits=1):
+        return "-" if value is None else f"{value:.{digits}f}" if isinstance(value, float) else str(value)
+
+    header = ("case", "mode", "p50 ms", "p95 ms", "p99 ms", "first ms", "render ms", "requests", "conns", "KB", "peak KB", "chars", "errors")
+    rows = [header]
+    for case, modes in results.items():
+        for mode, summary in modes.items():
+            rows.append((case, mode, cell(summary["p50_ms"], 2), cell(summary["p95_ms"], 2), cell(summary["p99_ms"], 2),
+                         cell(summary["first_section_p50_ms"], 2), cell(summary["render_p50_ms"], 3), cell(summary["requests"]),
+                         cell(summary.get("connections")), cell(summary["bytes"] / 1024), cell(summary["peak_kb"]), cell(summary["output_chars"]), cell(summary["errors"])))
+    widths = [max(len(row[column]) for row in rows) for column in range(len(header))]
+    for row in rows:
+        print("  ".join(value.ljust(width) if column < 2 else value.rjust(width) for column, (value, width) in enumerate(zip(row, widths))))
+    for case, modes in results.items():
+        for mode, summary in modes.items():
+            if summary.get("missing_fixtures"):
+                print(f"warning: {case} [{mode}] requested endpoints missing from the fixtures: {', '.join(summary['missing_fixtures'])}")
+
+
+def load_fixtures(args):
+    if args.synthetic:
+        fixtures = synthetic_fixtures()
+        return fixtures, {"source": "synthetic", "digest": fixtures_digest(fixtures)}
+    if not os.path.exists(os.path.join(args.fixtures, "manifest.json")):
+        sys.exit(f"No fixtures in {args.fixtures}. Record them with the record command, or pass --synthetic.")
+    fixtures, manifest = FixtureStore(args.fixtures).load()
+    return fixtures, {**manifest, "digest": fixtures_digest(fixtures)}
+
+
+def select_cases(names):
+    if not names:
+        return CORPUS
+    cases = tuple(case for case in CORPUS if any(case[0].startswith(name) for name in names))
+    if not cases:
+        sys.exit(f"No corpus case matches {', '.join(names)}. Cases: {', '.join(case[0] for case in CORPUS)}")
+    return cases
+
+
+def command_run(args) -> int:
+    fixtures, source = load_fixtures(args)
+    settings = {"latency_ms": args.latency, "jitter_ms": args.jitter, "error_rate": args.error_rate, "error_status": args.error_status}
+    stand_in = StandIn(fixtures, latency=args.latency / 1000, jitter=args.jitter / 1000, error_rate=args.error_rate,
+                       error_status=args.error_status, seed=args.seed)
+    try:
+        started = time.perf_counter()
+        results = asyncio.run(run_corpus(stand_in, args.iterations, select_cases(args.case), trace_memory=not args.no_memory))
+    finally:
+        stand_in.stop()
+    print_report(results)
+    print(f"\n{len(results)} cases x {args.iterations} iterations in {time.perf_counter() - started:.1f}s "
+          f"(fixtures: {source['source']} {source['digest']})")
+
+    report = {"fixtures": source, "settings": settings, "python": sys.version.split()[0], "results": results}
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+    if args.update_baseline:
+        if os.path.exists(args.baseline) and args.case:
+            # Keep the baseline of cases that were not run this time
+            with open(args.baseline) as handle:
+                report["results"] = {**json.load(handle)["results"], **results}
+        with open(args.baseline, "w") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run again with --update-baseline to store one.")
+        return 0
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    if baseline["fixtures"]["digest"] != source["digest"] or baseline["settings"] != settings:
+        print(f"Baseline was measured with different fixtures or settings ({baseline['fixtures']['source']} "
+              f"{baseline['fixtures']['digest']}, {baseline['settings']}); not comparing.")
+        return 2
+    regressions, slowdowns = compare(results, baseline["results"], args.tolerance, exact=not args.error_rate)
+    if args.strict_timing:
+        regressions += slowdowns
+        slowdowns = []
+    for slowdown in slowdowns:
+        print(f"SLOWER {slowdown}")
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(regressions)} regressions and {len(slowdowns)} slowdowns against {args.baseline} (tolerance {args.tolerance:.0%}"
+          f"{'' if args.strict_timing else ', timings reported only'}).")
+    return 1 if regressions else 0
+
+
+async def run_stress(stand_in: StandIn, callers: int, threads: int) -> dict:
+    """
+    Start callers concurrent get_pokemon_details("pikachu") calls and threads threads calling get_pokeapi("pokemon/mew")
+    at once, from a cold process (empty response cache and name indexes).
+    :return: Mapping of endpoint to the number of upstream requests it received.
+    """
+    tools = pokeprof.Tools()
+    tools.valves = tools.Valves(pokeapi_base_url=stand_in.base_url, cache_disk_path="", inverse_index_path="", rate_limit_per_second=0)
+    stand_in.stats(reset=True)
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        barrier = threading.Barrier(threads)
+
+        def fetch_mew():
+            # Release every thread together so their lookups overlap
+            barrier.wait()
+            return pokeprof.get_pokeapi("pokemon/mew")
+
+        results = await asyncio.gather(
+            *(tools.get_pokemon_details("pikachu") for _ in range(callers)),
+            *(loop.run_in_executor(pool, fetch_mew) for _ in range(threads)),
+            return_exceptions=True,
+        )
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        raise errors[0]
+    return stand_in.stats()["endpoints"]
+
+
+def command_stress(args) -> int:
+    fixtures, source = load_fixtures(args)
+    # Latency keeps every request in flight long enough for the concurrent callers to pile up behind it
+    stand_in = StandIn(fixtures, latency=args.latency / 1000)
+    try:
+        started = time.perf_counter()
+        endpoints = asyncio.run(run_stress(stand_in, args.callers, args.threads))
+    finally:
+        stand_in.stop()
+    duplicated = {endpoint: count for endpoint, count in endpoints.items() if count > 1}
+    print(f"{args.callers} concurrent get_pokemon_details calls and {args.threads} threads fetching pokemon/mew: "
+          f"{sum(endpoints.values())} upstream requests for {len(endpoints)} endpoints in {time.perf_counter() - started:.2f}s "
+          f"(fixtures: {source['source']} {source['digest']})")
+    for endpoint, count in sorted(duplicated.items()):
+        print(f"DUPLICATE {endpoint}: {count} upstream requests")
+    return 1 if duplicated else 0
+
+
+def command_record(args) -> int:
+    store = FixtureStore(args.fixtures)
+    existing = store.load()[0] if os.path.exists(os.path.join(args.fixtures, "manifest.json")) else {}
+    stand_in = StandIn(existing, upstream=args.upstream.rstrip("/"), store=args.fixtures)
+    try:
+        # One pass fetches (and so records) every endpoint the corpus, the name indexes and the reverse index touch
+        results = asyncio.run(run_corpus(stand_in, 1, CORPUS, trace_memory=False))
+    finally:
+        stand_in.stop()
+    store.write_manifest(args.upstream)
+    failed = [case for case, modes in results.items() if any(summary["errors"] for summary in modes.values())]
+    count = len([name for name in os.listdir(args.fixtures) if name.endswith(".json.gz")])
+    print(f"{args.fixtures}: {count} endpoints recorded from {args.upstream}")
+    if failed:
+        print(f"Cases that failed while recording: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the PokéProfGPT Tools methods against a local PokéAPI stand-in.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Record the fixtures the corpus needs from the real PokéAPI.")
+    record.add_argument("fixtures", nargs="?", default=DEFAULT_FIXTURES_PATH, help="Fixture directory to create or extend")
+    record.add_argument("--upstream", default=pokeprof.POKEAPI_BASE_URL, help="PokéAPI to record from")
+
+    run = commands.add_parser("run", help="Run the corpus and compare it with the baseline.")
+    run.add_argument("--fixtures", default=DEFAULT_FIXTURES_PATH, help="Recorded fixture directory")
+    run.add_argument("--synthetic", action="store_true", help="Use generated PokéAPI-shaped responses instead of recorded fixtures")
+    run.add_argument("--iterations", type=int, default=20, help="Timed calls per case and mode")
+    run.add_argument("--case", nargs="+", help="Only run cases starting with these names (e.g., movelist details/eevee)")
+    run.add_argument("--latency", type=float, default=0.0, help="Added latency per upstream request in milliseconds")
+    run.add_argument("--jitter", type=float, default=0.0, help="Uniform random extra latency in milliseconds")
+    run.add_argument("--error-rate", type=float, default=0.0, help="Fraction of upstream requests answered with --error-status")
+    run.add_argument("--error-status", type=int, default=503, help="Status code of injected errors")
+    run.add_argument("--seed", type=int, default=0, help="Seed for jitter and error injection")
+    run.add_argument("--no-memory", action="store_true", help="Skip the traced run that measures peak memory")
+    run.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Baseline file to compare with or update")
+    run.add_argument("--update-baseline", action="store_true", help="Store these results as the new baseline")
+    run.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative slowdown, memory and output growth before it is reported")
+    run.add_argument("--strict-timing", action="store_true", help="Also fail on slowdowns; only meaningful against a baseline from this machine")
+    run.add_argument("--output", help="Also write the full results as JSON to this file")
+
+    stress = commands.add_parser("stress", help="Check that concurrent identical lookups reach the upstream once per endpoint.")
+    stress.add_argument("--fixtures", default=DEFAULT_FIXTURES_PATH, help="Recorded fixture directory")
+    stress.add_argument("--synthetic", action="store_true", help="Use generated PokéAPI-shaped responses instead of recorded fixtures")
+    stress.add_argument("--callers", type=int, default=30, help="Concurrent get_pokemon_details calls")
+    stress.add_argument("--threads", type=int, default=40, help="Threads calling get_pokeapi at once")
+    stress.add_argument("--latency", type=float, default=50.0, help="Added latency per upstream request in milliseconds")
+
+    args = parser.parse_args()
+    return {"record": command_record, "run": command_run, "stress": command_stress}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
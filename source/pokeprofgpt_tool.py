@@ -12,28 +12,2405 @@ current-functions:
         description: Fetches the movelist of a Pokémon, grouped by version group and learn method.
     - name: get_egg_groups
         description: Fetches details about a specific egg group, including the Pokémon that belong to it.
+    - name: get_team_details
+        description: Fetches details about a team or evolution family of Pokémon at once, with a shared stats table.
+    - name: get_move_learners
+        description: Lists every Pokémon that can learn a move, optionally in a specific game.
+    - name: get_location_encounters
+        description: Lists every Pokémon that can be encountered at a location, optionally in a specific game.
+    - name: get_pokemon_by_type
+        description: Lists every Pokémon that has a type.
+    - name: get_type_matchups
+        description: Lists the weaknesses, resistances and immunities of a type or dual-type combination.
+    - name: get_movepool_coverage
+        description: Shows which types and Pokémon a set of moves hits super effectively, and which resist all of them.
+    - name: get_team_coverage
+        description: Summarizes a team's shared weaknesses and type coverage, and ranks the Pokémon that threaten it.
 author: q-johnson
 version: 0.0.8
 license: MIT License
+requirements: numpy
 """
 
+import abc
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import difflib
+import functools
+import heapq
+import itertools
+import json
+import os
+import random
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import unicodedata
+import zlib
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+import numpy as np
 import requests
+from pydantic import BaseModel, Field
+from requests.adapters import HTTPAdapter
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory file locks (Windows): the rate budget is then shared by this process's threads only
+    fcntl = None
+
+POKEAPI_BASE_URL = "https://pokeapi.co/api/v2"
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "pokeprofgpt", "pokeapi-cache.sqlite3")
+
+# Rate limiting and transient upstream failures are worth another attempt, everything else is final
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+DEFAULT_RATE_STATE_PATH = os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), "rate-limit.state")
+
+# Lower ranks are served first; background work is bulk indexing and anything else no user is waiting on
+REQUEST_PRIORITIES = {"interactive": 0, "background": 1}
+
+# Priority of the upstream requests made in the current context; set with request_priority()
+_request_priority = contextvars.ContextVar("pokeprofgpt_request_priority", default="interactive")
+
+
+@contextlib.contextmanager
+def request_priority(priority: str):
+    """
+    Run the enclosed PokeAPI lookups at a request priority ("interactive" or "background").
+    """
+    if priority not in REQUEST_PRIORITIES:
+        raise ValueError(f"Unknown request priority: {priority}")
+    token = _request_priority.set(priority)
+    try:
+        yield
+    finally:
+        _request_priority.reset(token)
+
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when an upstream request could not get through the rate governor within its wait limit.
+    """
+
+
+class RateGovernor:
+    """
+    Token bucket in front of every upstream request, so a burst of tool calls stays within PokeAPI's fair use.
+    With a state path the bucket lives in a small file guarded by an advisory lock and is shared by every
+    worker process on the machine; without one it is shared by this process's threads.
+    Waiting requests are served lowest priority rank first, and background requests may only spend the
+    part of the burst above the interactive reserve, so bulk indexing never drains what user calls need.
+    """
+
+    STATE_FORMAT = struct.Struct("<dd")
+
+    def __init__(self, rate: float = 10.0, burst: int = 20, state_path: str = "", background_share: float = 0.5,
+                 max_wait_seconds: float = 30.0, stale_wait_seconds: float = 1.0):
+        self.rate = rate
+        self.burst = burst
+        self.state_path = state_path
+        self.background_share = background_share
+        self.max_wait_seconds = max_wait_seconds
+        self.stale_wait_seconds = stale_wait_seconds
+        self.stats = {
+            "queue_depth": 0, "max_queue_depth": 0, "granted_interactive": 0, "granted_background": 0,
+            "wait_seconds_interactive": 0.0, "wait_seconds_background": 0.0, "rejected": 0, "degraded": 0,
+            "throttled": 0, "state_errors": 0,
+        }
+        self._tokens = float(burst)
+        self._updated = time.time()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._fd = None
+        self._condition = threading.Condition()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def configure(self, **settings):
+        """
+        Update governor settings. Changing the state path reopens the shared state file.
+        :param settings: Any of the constructor arguments (e.g., rate=5, burst=10).
+        """
+        with self._condition:
+            for key, value in settings.items():
+                if not hasattr(self, key) or key.startswith("_") or key in ("stats", "enabled"):
+                    raise TypeError(f"Unknown rate governor setting: {key}")
+                if key == "state_path" and value != self.state_path:
+                    self._close()
+                setattr(self, key, value)
+            self._tokens = min(self._tokens, float(self.burst))
+            self._condition.notify_all()
+
+    def _close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _shared_fd(self):
+        if not self.state_path or fcntl is None:
+            return None
+        if self._fd is None:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+                self._fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT, 0o600)
+            except OSError:
+                # An unwritable state path degrades to a per-process bucket rather than failing requests
+                self.stats["state_errors"] += 1
+                return None
+        return self._fd
+
+    def _update(self, change):
+        """
+        Refill the bucket, apply change(tokens, now) -> (tokens, result) and store the new level.
+        Runs under the process lock and, with a shared state file, under its exclusive file lock too.
+        """
+        fd = self._shared_fd()
+        if fd is None:
+            now = time.time()
+            tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+            self._tokens, result = change(tokens, now)
+            self._updated = now
+            return result
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            now = time.time()
+            raw = os.pread(fd, self.STATE_FORMAT.size, 0)
+            if len(raw) == self.STATE_FORMAT.size:
+                tokens, updated = self.STATE_FORMAT.unpack(raw)
+                # Never refill across a clock step backwards, and never beyond this process's burst
+                tokens = min(float(self.burst), tokens + max(0.0, now - updated) * self.rate)
+            else:
+                tokens = float(self.burst)
+            tokens, result = change(tokens, now)
+            os.pwrite(fd, self.STATE_FORMAT.pack(tokens, now), 0)
+            return result
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def _take(self, floor: float) -> float:
+        """
+        Take one token if that leaves at least floor in the bucket.
+        :return: 0 when the token was taken, otherwise the seconds until it could be.
+        """
+        def change(tokens, now):
+            if tokens - 1 >= floor:
+                return tokens - 1, 0.0
+            return tokens, (floor + 1 - tokens) / self.rate
+
+        try:
+            return self._update(change)
+        except OSError:
+            self.stats["state_errors"] += 1
+            self._close()
+            return self._update(change)
+
+    def acquire(self, priority: str = "interactive", max_wait: float = None) -> float:
+        """
+        Block until one upstream request may be sent.
+        :param priority: "interactive" or "background".
+        :param max_wait: Give up once the request would have waited longer than this many seconds; None waits up
+                         to max_wait_seconds for interactive requests and as long as it takes for background ones.
+        :return: Seconds waited.
+        :raises RateLimitExceeded: When the wait limit would be exceeded.
+        """
+        if not self.enabled:
+            return 0.0
+        if max_wait is None:
+            max_wait = self.max_wait_seconds if priority == "interactive" else float("inf")
+        floor = 0.0
+        if priority == "background":
+            # Always leave background requests at least one token of headroom below the burst, or a small burst
+            # or a zero share would make the reserve unreachable and background work would wait forever
+            floor = max(0.0, min(self.burst * (1 - self.background_share), self.burst - 1))
+        started = time.monotonic()
+        ticket = (REQUEST_PRIORITIES[priority], next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._queue, ticket)
+            self.stats["queue_depth"] = len(self._queue)
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self._queue))
+            # A new interactive request may overtake a sleeping background head, so wake it to re-check
+            self._condition.notify_all()
+            try:
+                while True:
+                    waited = time.monotonic() - started
+                    # Only the head of the local queue draws tokens, which is what orders requests by priority
+                    delay = self._take(floor) if self._queue[0] == ticket else None
+                    if delay == 0.0:
+                        self.stats[f"granted_{priority}"] += 1
+                        self.stats[f"wait_seconds_{priority}"] += waited
+                        _metrics.observe("rate_wait_seconds", {"priority": priority}, waited)
+                        return waited
+                    if waited + (delay or 0.0) > max_wait:
+                        self.stats["rejected"] += 1
+                        _metrics.inc("rate_rejected_total", {"priority": priority})
+                        raise RateLimitExceeded(
+                            f"Error fetching data from PokeAPI: request budget exhausted, no upstream slot within {max_wait:g}s"
+                        )
+                    if delay is None:
+                        self._condition.wait(None if max_wait == float("inf") else max_wait - waited)
+                    else:
+                        self._condition.wait(delay)
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self.stats["queue_depth"] = len(self._queue)
+                self._condition.notify_all()
+
+    def penalize(self, seconds: float):
+        """
+        Empty the bucket for the given time after PokeAPI answered 429, so every thread and worker backs off.
+        :param seconds: Delay the server asked for (Retry-After) or the retry backoff.
+        """
+        if not self.enabled or seconds <= 0:
+            return
+        with self._condition:
+            self.stats["throttled"] += 1
+            try:
+                self._update(lambda tokens, now: (min(tokens, -seconds * self.rate), None))
+            except OSError:
+                self.stats["state_errors"] += 1
+                self._close()
+
+    def record_degraded(self):
+        with self._condition:
+            self.stats["degraded"] += 1
+
+    def info(self) -> dict:
+        with self._condition:
+            return dict(self.stats)
+
+
+_governor = RateGovernor(state_path=DEFAULT_RATE_STATE_PATH)
+
+
+def configure_rate_governor(**settings):
+    """
+    Configure the shared upstream rate governor.
+    :param settings: Keyword arguments accepted by RateGovernor.configure.
+    """
+    _governor.configure(**settings)
+
+
+def get_rate_governor_stats() -> dict:
+    """
+    Snapshot of the rate governor: current and peak queue depth, grants and total wait per priority,
+    requests rejected or answered from stale cache entries, and 429 back-offs.
+    :return: Dictionary of governor statistics.
+    """
+    return _governor.info()
+
+
+class PokeAPITransport:
+    """
+    Pooled, keep-alive HTTP transport shared by every Tools method.
+    One requests.Session is reused across calls so repeated requests skip the TCP+TLS handshake.
+    """
+
+    def __init__(self, base_url: str = POKEAPI_BASE_URL, connect_timeout: float = 3.05, read_timeout: float = 10.0,
+                 max_retries: int = 3, backoff_factor: float = 0.5, backoff_max: float = 8.0, pool_maxsize: int = 16,
+                 governor: RateGovernor = None):
+        self.base_url = base_url.rstrip("/")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.pool_maxsize = pool_maxsize
+        self.governor = governor
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self) -> requests.Session:
+        session = requests.Session()
+        # Retries are handled in get() so they can be jittered and counted; the adapter only pools connections
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_maxsize, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+            "User-Agent": "PokeProfGPT",
+        })
+        return session
+
+    def configure(self, **settings):
+        """
+        Update transport settings. Changing the base URL or pool size drops the current session.
+        :param settings: Any of the constructor arguments (e.g., base_url="http://127.0.0.1:8000/api/v2").
+        """
+        rebuild = False
+        for key, value in settings.items():
+            if not hasattr(self, key) or key.startswith("_") or key == "stats":
+                raise TypeError(f"Unknown transport setting: {key}")
+            if key == "base_url":
+                value = value.rstrip("/")
+            if key in ("base_url", "pool_maxsize") and getattr(self, key) != value:
+                rebuild = True
+            setattr(self, key, value)
+        if rebuild:
+            self.close()
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def backoff_delay(self, attempt: int, retry_after: str = None) -> float:
+        """
+        Full-jitter exponential backoff, honouring a numeric Retry-After header when the server sends one.
+        :param attempt: Zero-based retry attempt.
+        :param retry_after: Raw Retry-After header value, if any.
+        :return: Seconds to sleep before the next attempt.
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = max(delay, min(self.backoff_max, float(retry_after)))
+            except ValueError:
+                pass
+        return delay
+
+    def get(self, endpoint: str, headers: dict = None, max_wait: float = None) -> requests.Response:
+        """
+        GET an endpoint relative to the base URL, retrying connection errors, timeouts, 429 and 5xx responses.
+        Every attempt first takes a slot from the rate governor at the current request priority.
+        :param endpoint: PokeAPI endpoint (e.g., "pokemon/pikachu").
+        :param headers: Extra request headers.
+        :param max_wait: Longest wait for a rate governor slot (see RateGovernor.acquire).
+        :return: The final requests.Response; non-retryable and exhausted statuses are returned, not raised.
+        :raises RateLimitExceeded: When no slot frees up within max_wait.
+        """
+        url = f"{self.base_url}/{endpoint}"
+        for attempt in range(self.max_retries + 1):
+            if self.governor is not None:
+                self.governor.acquire(_request_priority.get(), max_wait)
+            self.stats["requests"] += 1
+            try:
+                response = self.session.get(url, headers=headers, timeout=(self.connect_timeout, self.read_timeout))
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if attempt == self.max_retries:
+                    self.stats["failures"] += 1
+                    raise Exception(f"Error fetching data from PokeAPI: {error}") from error
+                self.stats["retries"] += 1
+                time.sleep(self.backoff_delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                self.stats["retries"] += 1
+                delay = self.backoff_delay(attempt, response.headers.get("Retry-After"))
+                if response.status_code == 429 and self.governor is not None:
+                    # Over PokeAPI's limit: hold back every other request too instead of letting them all collect 429s
+                    self.governor.penalize(delay)
+                time.sleep(delay)
+                continue
+            return response
+
+    def connection_stats(self) -> dict:
+        """
+        Count connections opened and requests sent by the urllib3 pools behind the session.
+        :return: Dictionary with "connections" (handshakes) and "pool_requests".
+        """
+        connections = 0
+        pool_requests = 0
+        if self._session is not None:
+            # The same adapter is mounted for both schemes, so count each one once
+            for adapter in {id(adapter): adapter for adapter in self._session.adapters.values()}.values():
+                pools = adapter.poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is not None:
+                        connections += pool.num_connections
+                        pool_requests += pool.num_requests
+        return {"connections": connections, "pool_requests": pool_requests}
+
+
+_transport = PokeAPITransport(governor=_governor)
+
+
+def configure_transport(**settings):
+    """
+    Configure the shared PokeAPI transport (e.g., point it at a local stand-in server for testing).
+    :param settings: Keyword arguments accepted by PokeAPITransport.configure.
+    """
+    _transport.configure(**settings)
+
+
+def get_transport_stats() -> dict:
+    """
+    Snapshot of the shared transport counters.
+    :return: Dictionary of request, retry, failure and connection counts.
+    """
+    return {**_transport.stats, **_transport.connection_stats()}
+
+
+# Histogram bucket upper bounds in seconds, from cache hits up to retried upstream calls
+METRIC_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(METRIC_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(METRIC_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    In-process counters and histograms for Tools calls and PokeAPI fetches, exportable as Prometheus text or JSON.
+    Every recording method returns immediately while the registry is disabled.
+    """
+
+    def __init__(self, enabled: bool = False, prefix: str = "pokeprofgpt"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, labels: dict, value: float = 1):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, labels: dict, value: float):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _gauges(self) -> dict:
+        # Counters kept by the transport, cache and coalescing layers, exported alongside the registry's own
+        gauges = {f"transport_{key}": value for key, value in get_transport_stats().items()}
+        gauges.update({f"cache_{key}": value for key, value in get_cache_stats().items()})
+        gauges.update({f"rate_governor_{key}": value for key, value in get_rate_governor_stats().items()})
+        for layer, stats in get_coalescing_stats().items():
+            gauges.update({f"coalescing_{layer}_{key}": value for key, value in stats.items()})
+        return gauges
+
+    def export_json(self) -> dict:
+        """
+        :return: Dictionary with "counters", "histograms" (bucket bounds, counts, sum, count) and "gauges".
+        """
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in self._counters.items()]
+            histograms = [
+                {"name": name, "labels": dict(labels), "buckets": list(METRIC_BUCKETS), "counts": list(histogram.counts),
+                 "sum": histogram.total, "count": histogram.count}
+                for (name, labels), histogram in self._histograms.items()
+            ]
+        return {"counters": counters, "histograms": histograms, "gauges": self._gauges()}
+
+    def export_prometheus(self) -> str:
+        """
+        :return: Metrics in the Prometheus text exposition format.
+        """
+        def label_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            return "{" + ",".join([f'{key}="{value}"' for key, value in pairs]) + "}" if pairs else ""
+
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+        for name in sorted({name for (name, _), _ in counters}):
+            lines.append(f"# TYPE {self.prefix}_{name} counter")
+            lines.extend([f"{self.prefix}_{name}{label_text(labels)} {value}" for (counter, labels), value in counters if counter == name])
+        for name in sorted({name for (name, _), _ in histograms}):
+            lines.append(f"# TYPE {self.prefix}_{name} histogram")
+            for (histogram_name, labels), histogram in histograms:
+                if histogram_name != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(METRIC_BUCKETS + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{self.prefix}_{name}_bucket{label_text(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{self.prefix}_{name}_sum{label_text(labels)} {histogram.total}")
+                lines.append(f"{self.prefix}_{name}_count{label_text(labels)} {histogram.count}")
+        for name, value in sorted(self._gauges().items()):
+            lines.append(f"# TYPE {self.prefix}_{name} gauge")
+            lines.append(f"{self.prefix}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics = MetricsRegistry()
+
+# Per-call measurements of the Tools method currently running; None outside instrumented calls
+_call_metrics = contextvars.ContextVar("pokeprofgpt_call_metrics", default=None)
+
+
+def configure_metrics(enabled: bool):
+    _metrics.enabled = enabled
+
+
+def export_metrics(format: str = "prometheus"):
+    """
+    Export the metrics registry.
+    :param format: "prometheus" for the text exposition format, "json" for a dictionary.
+    :return: Prometheus text or a JSON-serializable dictionary.
+    """
+    return _metrics.export_json() if format == "json" else _metrics.export_prometheus()
+
+
+def instrumented(method):
+    """
+    Measure a Tools method: wall time, render time (everything after its last PokeAPI lookup), upstream
+    latency, bytes and decode time of its lookups and how each lookup was answered. Results go to the
+    metrics registry and, when the emit_performance_status Valve is on, to an Open WebUI status event.
+    Calls run unmeasured while both are off.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        emitter = kwargs.get("__event_emitter__") if self.valves.emit_performance_status else None
+        if not _metrics.enabled and emitter is None:
+            return await method(self, *args, **kwargs)
+
+        call = {"outcomes": {}, "upstream_seconds": 0.0, "bytes": 0, "decode_seconds": 0.0, "last_fetch": None}
+        token = _call_metrics.set(call)
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            return await method(self, *args, **kwargs)
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            finished = time.perf_counter()
+            _call_metrics.reset(token)
+            wall_seconds = finished - started
+            render_seconds = finished - (call["last_fetch"] or started)
+            labels = {"tool": method.__name__}
+            _metrics.observe("tool_seconds", labels, wall_seconds)
+            _metrics.observe("render_seconds", labels, render_seconds)
+            _metrics.inc("tool_calls_total", {**labels, "status": status})
+            if emitter is not None:
+                outcomes = ", ".join([f"{count} {outcome.replace('_', ' ')}" for outcome, count in sorted(call["outcomes"].items())])
+                try:
+                    await emitter({
+                        "type": "status",
+                        "data": {
+                            "description": (
+                                f"{method.__name__}: {wall_seconds * 1000:.0f} ms ({outcomes or 'no lookups'}; "
+                                f"{call['upstream_seconds'] * 1000:.0f} ms upstream, {call['bytes'] / 1024:.0f} KB, "
+                                f"{call['decode_seconds'] * 1000:.0f} ms decoding, {render_seconds * 1000:.0f} ms rendering)"
+                            ),
+                            "done": True,
+                        },
+                    })
+                except Exception:
+                    # Reporting must never turn a successful answer into a failed tool call
+                    pass
+
+    return wrapper
+
+
+async def emit_message(emitter, content: str):
+    """
+    Append content to the chat message through Open WebUI's event emitter; does nothing without an emitter.
+    """
+    if emitter is None or not content:
+        return
+    try:
+        await emitter({"type": "message", "data": {"content": content}})
+    except Exception:
+        # Streamed sections are a preview of the returned prompt, so a failed emit must not fail the tool call
+        pass
+
+
+def is_not_found(error: BaseException) -> bool:
+    """
+    Whether a lookup failed because the name does not exist (an unresolved name or a 404), as opposed to
+    PokeAPI being unreachable, failing or over its rate limit.
+    """
+    return isinstance(error, ValueError) or "[404]" in str(error)
+
+
+def sort_lookup_failures(requested: list, resolved: list, names: list, raw_data: list) -> tuple:
+    """
+    Split the failures of a batch of name resolutions and fetches into names that do not exist and lookups PokeAPI failed to answer.
+    :param requested: Names as given by the user or model.
+    :param resolved: Results of resolving each requested name (names or exceptions).
+    :param names: Successfully resolved names, in the order they were fetched.
+    :param raw_data: Results of fetching each name (data or exceptions).
+    :return: Tuple of (not found messages, list of (name, exception) for every other failure).
+    """
+    not_found, failed = [], []
+    for name, result in list(zip(requested, resolved)) + list(zip(names, raw_data)):
+        if not isinstance(result, Exception):
+            continue
+        if not is_not_found(result):
+            failed.append((f"'{name}'", result))
+        else:
+            not_found.append(str(result) if isinstance(result, ValueError) else f"'{name}'")
+    return not_found, failed
+
+
+def resource_of(endpoint: str) -> str:
+    return endpoint.split("?", 1)[0].split("/", 1)[0]
+
+
+def record_fetch(endpoint: str, outcome: str):
+    """
+    Record how a PokeAPI lookup was answered: cache_hit, snapshot, fetched, revalidated, coalesced or stale.
+    """
+    call = _call_metrics.get()
+    if call is not None:
+        call["outcomes"][outcome] = call["outcomes"].get(outcome, 0) + 1
+        call["last_fetch"] = time.perf_counter()
+    if _metrics.enabled:
+        _metrics.inc("fetch_total", {"resource": resource_of(endpoint), "outcome": outcome})
+
+
+def record_upstream(endpoint: str, status: int, seconds: float, size: int, decode_seconds: float):
+    """
+    Record one upstream round trip: latency, bytes received and JSON decode time.
+    """
+    call = _call_metrics.get()
+    if call is not None:
+        call["upstream_seconds"] += seconds
+        call["bytes"] += size
+        call["decode_seconds"] += decode_seconds
+    if _metrics.enabled:
+        labels = {"resource": resource_of(endpoint)}
+        _metrics.observe("upstream_seconds", labels, seconds)
+        _metrics.observe("decode_seconds", labels, decode_seconds)
+        _metrics.inc("upstream_bytes_total", labels, size)
+        _metrics.inc("upstream_responses_total", {**labels, "status": status})
+
+
+def project_fields(data, fields):
+    """
+    Keep only the requested fields of a PokeAPI response. Dotted paths select nested keys.
+    :param data: Decoded JSON object.
+    :param fields: Iterable of field paths (e.g., ("name", "sprites.front_default")), or None for everything.
+    :return: A new dictionary containing only the requested fields that are present.
+    """
+    if fields is None or not isinstance(data, dict):
+        return data
+    projected = {}
+    for field in fields:
+        source = data
+        target = projected
+        *parents, leaf = field.split(".")
+        for parent in parents:
+            source = source.get(parent) if isinstance(source, dict) else None
+            if source is None:
+                break
+            target = target.setdefault(parent, {})
+        else:
+            if isinstance(source, dict) and leaf in source:
+                target[leaf] = source[leaf]
+    return projected
+
+
+class Record(abc.ABC):
+    """
+    Base of the compact records the memory tier keeps in place of raw responses. A Record subclass can be passed
+    wherever field tuples are accepted (get_pokeapi, plan_resources); it is built once, when the response is decoded.
+    """
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Records are built through the from_json classmethod, which ABC only checks on instantiation,
+        # so a subclass without it is rejected when it is defined
+        if getattr(cls.from_json, "__isabstractmethod__", False):
+            raise TypeError(f"{cls.__name__} must implement from_json")
+
+    @classmethod
+    @abc.abstractmethod
+    def from_json(cls, data):
+        """
+        :param data: Decoded JSON response.
+        :return: The record built from it.
+        """
+
+    def nbytes(self) -> int:
+        return object_size(self)
+
+
+def object_size(value) -> int:
+    """
+    Approximate memory held by a record or a decoded JSON value, counting shared strings once per reference.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, Record):
+        size += sum(object_size(getattr(value, slot)) for slot in value.__slots__)
+    elif isinstance(value, (tuple, list)):
+        size += sum(object_size(item) for item in value)
+    elif isinstance(value, dict):
+        size += sum(object_size(key) + object_size(item) for key, item in value.items())
+    return size
+
+
+def is_record_view(fields) -> bool:
+    return isinstance(fields, type) and issubclass(fields, Record)
+
+
+def build_view(data, fields):
+    """
+    Turn a decoded response into the view a caller asked for.
+    :param fields: A Record subclass, field paths for project_fields, or None for the whole response.
+    :return: The record, the projected dictionary, or data itself.
+    """
+    return fields.from_json(data) if is_record_view(fields) else project_fields(data, fields)
+
+
+def view_size(view) -> int:
+    return view.nbytes() if isinstance(view, Record) else len(json.dumps(view, separators=(",", ":")))
+
+
+def view_key(endpoint: str, fields) -> str:
+    if is_record_view(fields):
+        return f"{endpoint}#{fields.__name__}"
+    return endpoint if fields is None else f"{endpoint}#{','.join(fields)}"
+
+
+class CacheEntry:
+    __slots__ = ("data", "size", "etag", "last_modified", "expires_at")
+
+    def __init__(self, data, size: int, etag: str = None, last_modified: str = None, expires_at: float = 0.0):
+        self.data = data
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> dict:
+        """
+        Conditional request headers used to revalidate an expired entry.
+        :return: If-None-Match / If-Modified-Since headers, or an empty dict if the entry has no validators.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Two-tier cache for PokeAPI responses: a size-bounded in-process LRU with TTL in front of a
+    SQLite store (WAL mode) that several Open WebUI worker processes can share.
+    The disk tier keeps whole responses; the memory tier keeps only the fields or compact Record a caller asked for.
+    Expired entries are kept so they can be revalidated with ETag/Last-Modified instead of re-downloaded.
+    """
+
+    def __init__(self, enabled: bool = True, ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 1024,
+                 max_memory_bytes: int = 64 * 1024 * 1024, disk_path: str = DEFAULT_CACHE_PATH,
+                 disk_max_bytes: int = 512 * 1024 * 1024):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_path = disk_path
+        self.disk_max_bytes = disk_max_bytes
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stale": 0, "revalidated": 0,
+                      "stores": 0, "evictions": 0, "disk_evictions": 0, "disk_errors": 0, "decoded_bytes": 0}
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.RLock()
+        self._db = None
+
+    def configure(self, **settings):
+        """
+        Update cache settings. Changing the disk path reopens the store; lowering limits evicts immediately.
+        :param settings: Any of the constructor arguments.
+        """
+        with self._lock:
+            for key, value in settings.items():
+                if not hasattr(self, key) or key.startswith("_") or key == "stats":
+                    raise TypeError(f"Unknown cache setting: {key}")
+                if key == "disk_path" and value != self.disk_path:
+                    self._close_db()
+                setattr(self, key, value)
+            self._evict_memory()
+
+    def _connect(self):
+        if self._db is None and self.disk_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.disk_path)), exist_ok=True)
+                db = sqlite3.connect(self.disk_path, timeout=5, check_same_thread=False, isolation_level=None)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "endpoint TEXT PRIMARY KEY, body BLOB NOT NULL, stored INTEGER NOT NULL, size INTEGER NOT NULL, "
+                    "etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL, expires_at REAL NOT NULL)"
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS responses_fetched_at ON responses (fetched_at)")
+                self._db = db
+            except (sqlite3.Error, OSError):
+                # An unusable disk tier degrades to memory-only caching rather than failing tool calls
+                self.stats["disk_errors"] += 1
+                self.disk_path = ""
+        return self._db
+
+    def _close_db(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, endpoint: str, entry: CacheEntry):
+        previous = self._entries.pop(endpoint, None)
+        if previous is not None:
+            self._memory_bytes -= previous.size
+        self._entries[endpoint] = entry
+        self._memory_bytes += entry.size
+        self._evict_memory()
+
+    def _evict_memory(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._memory_bytes > self.max_memory_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._memory_bytes -= evicted.size
+            self.stats["evictions"] += 1
+
+    def get(self, endpoint: str, fields=None):
+        """
+        Look up an endpoint in memory, then on disk. Stale entries are returned too; check entry.fresh.
+        :param endpoint: PokeAPI endpoint (e.g., "pokemon/pikachu").
+        :param fields: Field paths or Record subclass the caller needs (see build_view), or None for the whole response.
+        :return: CacheEntry or None.
+        """
+        if not self.enabled:
+            return None
+        key = view_key(endpoint, fields)
+        row = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["memory_hits" if entry.fresh else "stale"] += 1
+                return entry
+
+            db = self._connect()
+            if db is not None:
+                try:
+                    row = db.execute(
+                        "SELECT body, size, etag, last_modified, expires_at FROM responses WHERE endpoint = ?",
+                        (endpoint,),
+                    ).fetchone()
+                except sqlite3.Error:
+                    self.stats["disk_errors"] += 1
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+        # Decompressing, parsing and projecting a large body happens outside the lock so disk hits on other
+        # threads are not serialized behind it
+        body, size, etag, last_modified, expires_at = row
+        data = build_view(json.loads(zlib.decompress(body)), fields)
+        decoded_size = size
+        if fields is not None:
+            size = view_size(data)
+        entry = CacheEntry(data, size, etag, last_modified, expires_at)
+        with self._lock:
+            self.stats["decoded_bytes"] += decoded_size
+            self.stats["disk_hits" if entry.fresh else "stale"] += 1
+            # Another thread may have decoded the same view meanwhile; keep the one already in memory
+            existing = self._entries.get(key)
+            if existing is not None:
+                return existing
+            self._remember(key, entry)
+            return entry
+
+    def get_fresh(self, endpoint: str, fields=None):
+        """
+        Look up a fresh entry in the memory tier only; never touches the disk, so it is cheap enough for the event loop.
+        :param endpoint: PokeAPI endpoint.
+        :param fields: Field paths or Record subclass the caller needs, or None for the whole response.
+        :return: Fresh CacheEntry or None; misses and stale entries are left for get to count.
+        """
+        if not self.enabled:
+            return None
+        key = view_key(endpoint, fields)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.fresh:
+                return None
+            self._entries.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return entry
+
+    def put(self, endpoint: str, data, size: int, etag: str = None, last_modified: str = None, fields=None,
+            persist: bool = True, remember: bool = True) -> CacheEntry:
+        """
+        Store a freshly downloaded response: the whole body on disk, the requested fields in memory.
+        :param endpoint: PokeAPI endpoint.
+        :param data: Decoded JSON.
+        :param size: Size of the response body in bytes, used for the memory bound.
+        :param fields: Field paths or Record subclass the caller needs, or None for the whole response.
+        :param persist: Also write the response to the disk tier.
+        :param remember: Keep the requested fields in the memory tier (bulk jobs turn this off to avoid flushing it).
+        :return: The CacheEntry holding the requested fields.
+        """
+        self.stats["decoded_bytes"] += size
+        view = build_view(data, fields)
+        if not self.enabled or not remember:
+            if persist:
+                self.persist(endpoint, data, size, etag, last_modified)
+            return CacheEntry(view, size, etag, last_modified)
+        entry = CacheEntry(view, size if fields is None and size else view_size(view), etag, last_modified, time.time() + self.ttl_seconds)
+        with self._lock:
+            self._remember(view_key(endpoint, fields), entry)
+            self.stats["stores"] += 1
+        if persist:
+            self.persist(endpoint, data, size, etag, last_modified)
+        return entry
+
+    def persist(self, endpoint: str, data, size: int, etag: str = None, last_modified: str = None, content: bytes = None):
+        """
+        Write a whole response to the disk tier only.
+        :param endpoint: PokeAPI endpoint.
+        :param data: Decoded JSON.
+        :param size: Size of the response body in bytes.
+        :param content: The raw JSON body when the caller has it, so it is stored without serializing data again.
+        """
+        if not self.enabled or not self.disk_path:
+            return
+        # Compressing a large body happens outside the lock so cache lookups on other threads are not serialized behind it
+        body = zlib.compress(content if content is not None else json.dumps(data, separators=(",", ":")).encode())
+        with self._lock:
+            db = self._connect()
+            if db is not None:
+                try:
+                    db.execute(
+                        "INSERT OR REPLACE INTO responses (endpoint, body, stored, size, etag, last_modified, fetched_at, expires_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (endpoint, body, len(body), size, etag, last_modified, time.time(), time.time() + self.ttl_seconds),
+                    )
+                    self._evict_disk(db)
+                except sqlite3.Error:
+                    self.stats["disk_errors"] += 1
+
+    def refresh(self, endpoint: str, entry: CacheEntry, etag: str = None, last_modified: str = None):
+        """
+        Extend the lifetime of an entry after the server answered 304 Not Modified.
+        :param endpoint: PokeAPI endpoint.
+        :param entry: The stale entry that was revalidated.
+        """
+        entry.expires_at = time.time() + self.ttl_seconds
+        entry.etag = etag or entry.etag
+        entry.last_modified = last_modified or entry.last_modified
+        with self._lock:
+            self.stats["revalidated"] += 1
+            db = self._connect()
+            if db is not None:
+                try:
+                    db.execute(
+                        "UPDATE responses SET expires_at = ?, etag = ?, last_modified = ? WHERE endpoint = ?",
+                        (entry.expires_at, entry.etag, entry.last_modified, endpoint),
+                    )
+                except sqlite3.Error:
+                    self.stats["disk_errors"] += 1
+
+    def _evict_disk(self, db):
+        # Compressed bodies are what occupy the file, so bound on their length and drop the oldest downloads first
+        total = db.execute("SELECT COALESCE(SUM(stored), 0) FROM responses").fetchone()[0]
+        if total <= self.disk_max_bytes:
+            return
+        excess = total - self.disk_max_bytes
+        freed = 0
+        doomed = []
+        for endpoint, length in db.execute("SELECT endpoint, stored FROM responses ORDER BY fetched_at"):
+            doomed.append((endpoint,))
+            freed += length
+            if freed >= excess:
+                break
+        db.executemany("DELETE FROM responses WHERE endpoint = ?", doomed)
+        self.stats["disk_evictions"] += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+            db = self._connect()
+            if db is not None:
+                try:
+                    db.execute("DELETE FROM responses")
+                except sqlite3.Error:
+                    self.stats["disk_errors"] += 1
+
+    def info(self) -> dict:
+        with self._lock:
+            return {**self.stats, "memory_entries": len(self._entries), "memory_bytes": self._memory_bytes}
+
+
+_cache = ResponseCache()
+
+
+def configure_cache(**settings):
+    """
+    Configure the shared response cache (size limits, TTL, on-disk location).
+    :param settings: Keyword arguments accepted by ResponseCache.configure.
+    """
+    _cache.configure(**settings)
+
+
+def get_cache_stats() -> dict:
+    """
+    Snapshot of the response cache counters (hits, misses, evictions, revalidations) and memory usage.
+    :return: Dictionary of cache statistics.
+    """
+    return _cache.info()
+
+
+# Resources the Tools methods read; the default set copied out of the api-data dump by ingest_api_data
+SNAPSHOT_RESOURCES = (
+    "pokemon", "pokemon-species", "pokemon-form", "evolution-chain", "ability", "egg-group", "item",
+    "move", "type", "version", "version-group", "generation", "location-area",
+)
+
+
+def canonical_endpoint(endpoint: str) -> str:
+    # List endpoints are stored whole, so "pokemon?limit=100000" and "pokemon/" are both just "pokemon"
+    return endpoint.split("?", 1)[0].strip("/")
+
+
+class SnapshotStore:
+    """
+    Offline backend for get_pokeapi: a local, compact PokeAPI snapshot built by ingest_api_data.
+    Responses are zlib-compressed JSON keyed by canonical endpoint ("pokemon/25"), and names resolve
+    through an alias table ("pokemon/pikachu" -> "pokemon/25"), so no lookup touches the network.
+    """
+
+    def __init__(self, path: str = "", offline_only: bool = False):
+        self.path = path
+        self.offline_only = offline_only
+        self.stats = {"hits": 0, "misses": 0, "errors": 0}
+        self._db = None
+        self._lock = threading.Lock()
+
+    def configure(self, path: str = None, offline_only: bool = None):
+        """
+        Point the backend at a snapshot file. An empty path switches offline mode off.
+        :param path: Path of a snapshot built by ingest_api_data.
+        :param offline_only: Fail instead of falling back to the network when an endpoint is missing.
+        """
+        with self._lock:
+            if path is not None and path != self.path:
+                if self._db is not None:
+                    self._db.close()
+                    self._db = None
+                self.path = path
+            if offline_only is not None:
+                self.offline_only = offline_only
+
+    def _connect(self):
+        if self._db is None and self.path:
+            if not os.path.exists(self.path):
+                raise Exception(f"Offline snapshot not found: {self.path}")
+            self._db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        return self._db
+
+    @property
+    def available(self) -> bool:
+        return bool(self.path)
+
+    def metadata(self) -> dict:
+        """
+        Version stamp and provenance of the snapshot.
+        :return: Dictionary of snapshot metadata (version, built_at, source, ...), empty if offline mode is off.
+        """
+        if not self.available:
+            return {}
+        with self._lock:
+            return dict(self._connect().execute("SELECT key, value FROM meta").fetchall())
+
+    def get(self, endpoint: str):
+        """
+        Answer a PokeAPI endpoint from the snapshot. A missing or unreadable snapshot is treated like a miss,
+        so lookups fall back to the network, unless offline_only is set.
+        :param endpoint: PokeAPI endpoint, by id or by name (e.g., "pokemon/pikachu/encounters").
+        :return: Decoded JSON response, or None if the snapshot does not contain it.
+        """
+        key = canonical_endpoint(endpoint)
+        try:
+            with self._lock:
+                db = self._connect()
+                row = db.execute("SELECT body FROM resources WHERE endpoint = ?", (key,)).fetchone()
+                if row is None:
+                    parts = key.split("/")
+                    target = db.execute("SELECT endpoint FROM aliases WHERE alias = ?", ("/".join(parts[:2]),)).fetchone()
+                    if target is not None:
+                        resolved = "/".join([target[0]] + parts[2:])
+                        row = db.execute("SELECT body FROM resources WHERE endpoint = ?", (resolved,)).fetchone()
+        except Exception as error:
+            self.stats["errors"] += 1
+            if self.offline_only:
+                raise Exception(f"Error fetching data from PokeAPI: {error}") from error
+            return None
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return json.loads(zlib.decompress(row[0]))
+
+
+def ingest_api_data(source: str, snapshot_path: str, version: str = None, resources=SNAPSHOT_RESOURCES) -> dict:
+    """
+    Build or incrementally update an offline snapshot from the published PokeAPI api-data JSON dump.
+    Files whose size and modification time are unchanged since the last ingest are skipped.
+    :param source: Checkout of https://github.com/PokeAPI/api-data (or its data/api/v2 directory).
+    :param snapshot_path: SQLite file to create or update.
+    :param version: Version stamp recorded in the snapshot; defaults to the ingest time (UTC).
+    :param resources: Resource directories to copy (e.g., ("pokemon", "pokemon-species")).
+    :return: Counts of added, updated, unchanged and removed endpoints.
+    """
+    root = source
+    for candidate in (os.path.join(source, "data", "api", "v2"), os.path.join(source, "api", "v2")):
+        if os.path.isdir(candidate):
+            root = candidate
+            break
+
+    counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    os.makedirs(os.path.dirname(os.path.abspath(snapshot_path)), exist_ok=True)
+    db = sqlite3.connect(snapshot_path)
+    try:
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        db.execute("CREATE TABLE IF NOT EXISTS resources (endpoint TEXT PRIMARY KEY, body BLOB NOT NULL, stamp TEXT NOT NULL)")
+        db.execute("CREATE TABLE IF NOT EXISTS aliases (alias TEXT PRIMARY KEY, endpoint TEXT NOT NULL)")
+        stamps = dict(db.execute("SELECT endpoint, stamp FROM resources"))
+
+        for resource in resources:
+            base = os.path.join(root, resource)
+            if not os.path.isdir(base):
+                continue
+            seen = set()
+            for directory, _, files in os.walk(base):
+                if "index.json" not in files:
+                    continue
+                endpoint = os.path.relpath(directory, root).replace(os.sep, "/")
+                file_path = os.path.join(directory, "index.json")
+                stat = os.stat(file_path)
+                stamp = f"{stat.st_mtime_ns}:{stat.st_size}"
+                seen.add(endpoint)
+                if stamps.get(endpoint) == stamp:
+                    counts["unchanged"] += 1
+                    continue
+
+                with open(file_path, "rb") as handle:
+                    data = json.loads(handle.read())
+                body = zlib.compress(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode(), 9)
+                db.execute("INSERT OR REPLACE INTO resources (endpoint, body, stamp) VALUES (?, ?, ?)", (endpoint, body, stamp))
+                counts["updated" if endpoint in stamps else "added"] += 1
+
+                # Detail resources ("pokemon/25") are also reachable by name ("pokemon/pikachu")
+                if endpoint.count("/") == 1 and isinstance(data, dict) and data.get("name"):
+                    db.execute("INSERT OR REPLACE INTO aliases (alias, endpoint) VALUES (?, ?)", (f"{resource}/{data['name']}", endpoint))
+
+            stale = [endpoint for endpoint in stamps if (endpoint == resource or endpoint.startswith(f"{resource}/")) and endpoint not in seen]
+            db.executemany("DELETE FROM resources WHERE endpoint = ?", [(endpoint,) for endpoint in stale])
+            db.executemany("DELETE FROM aliases WHERE endpoint = ?", [(endpoint,) for endpoint in stale])
+            counts["removed"] += len(stale)
+
+        meta = {
+            "version": version or time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "built_at": str(int(time.time())),
+            "source": os.path.abspath(source),
+            "resources": ",".join(resources),
+        }
+        db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", meta.items())
+        db.commit()
+    finally:
+        db.close()
+    return counts
+
+
+_snapshot = SnapshotStore()
+
+
+def configure_snapshot(**settings):
+    """
+    Configure the offline snapshot backend used by get_pokeapi.
+    :param settings: Keyword arguments accepted by SnapshotStore.configure.
+    """
+    _snapshot.configure(**settings)
+
+
+class SingleFlight:
+    """
+    Merge concurrent identical calls: the first caller for a key runs the function, and every caller that
+    arrives while it is in flight shares its result or exception instead of running it again.
+    Works for threads (do) and for asyncio callers, which await the shared future without holding a thread (submit).
+    """
+
+    def __init__(self):
+        self.stats = {"leaders": 0, "coalesced": 0}
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = self._calls[key] = Future()
+            # A running future cannot be cancelled, so one waiter giving up never cancels the call for the others
+            future.set_running_or_notify_cancel()
+            self.stats["leaders"] += 1
+            return future, True
+
+    def _run(self, key, future, func, args):
+        try:
+            result = func(*args)
+        except BaseException as error:
+            with self._lock:
+                self._calls.pop(key, None)
+            future.set_exception(error)
+        else:
+            with self._lock:
+                self._calls.pop(key, None)
+            future.set_result(result)
+
+    def do(self, key, func, *args):
+        """
+        Run func(*args) in the calling thread, or wait for an identical call already in flight.
+        :param key: Hashable identity of the call.
+        :return: Tuple of (shared result, True if this caller joined another call); the shared exception is raised in every caller.
+        """
+        future, leader = self._join(key)
+        if leader:
+            self._run(key, future, func, args)
+        return future.result(), not leader
+
+    def submit(self, key, executor, func, *args):
+        """
+        Start func(*args) on an executor, or join an identical call already in flight.
+        :param key: Hashable identity of the call.
+        :param executor: Executor that runs the call if this caller is the first.
+        :return: Tuple of (concurrent.futures.Future shared by every caller with this key, True if this caller joined another call).
+        """
+        future, leader = self._join(key)
+        if leader:
+            executor.submit(self._run, key, future, func, args)
+        return future, not leader
+
+
+# Upstream downloads are coalesced by endpoint and conditional headers; awaiting callers by endpoint and fields
+_upstream_flight = SingleFlight()
+_async_flight = SingleFlight()
+
+
+def get_coalescing_stats() -> dict:
+    """
+    Counts of calls that went upstream (leaders) and calls that shared an in-flight result (coalesced).
+    :return: Dictionary with "upstream" and "async" counters.
+    """
+    return {"upstream": dict(_upstream_flight.stats), "async": dict(_async_flight.stats)}
+
+
+def download_pokeapi(endpoint: str, validators: dict, max_wait: float = None):
+    """
+    One upstream round trip for an endpoint; a 200 response is written to the disk cache once, here.
+    :param endpoint: PokeAPI endpoint.
+    :param validators: Conditional request headers from a stale cache entry (may be empty).
+    :param max_wait: Longest wait for a rate governor slot; None uses the governor's default.
+    :return: Tuple of (status code, decoded JSON or None on 304, body size, ETag, Last-Modified).
+    """
+    started = time.perf_counter()
+    response = _transport.get(endpoint, headers=validators or None, max_wait=max_wait)
+    upstream_seconds = time.perf_counter() - started
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if response.status_code == 304 and validators:
+        record_upstream(endpoint, 304, upstream_seconds, 0, 0.0)
+        return 304, None, 0, etag, last_modified
+    if response.status_code == 200:
+        started = time.perf_counter()
+        data = response.json()
+        record_upstream(endpoint, 200, upstream_seconds, len(response.content), time.perf_counter() - started)
+        _cache.persist(endpoint, data, len(response.content), etag, last_modified, response.content)
+        return 200, data, len(response.content), etag, last_modified
+    else:
+        raise Exception(f"Error fetching data from PokeAPI: [{response.status_code}] {response.text}")
+
+
+def get_pokeapi(endpoint: str, fields=None, remember: bool = True):
+    entry = _cache.get(endpoint, fields)
+    if entry is not None and entry.fresh:
+        record_fetch(endpoint, "cache_hit")
+        return entry.data
+
+    if _snapshot.available:
+        data = _snapshot.get(endpoint)
+        if data is not None:
+            record_fetch(endpoint, "snapshot")
+            # The snapshot is already on disk, so only the memory tier keeps a copy
+            return _cache.put(endpoint, data, 0, fields=fields, persist=False, remember=remember).data
+    # Checked whether or not a snapshot is configured: offline_only must never reach the network
+    if _snapshot.offline_only:
+        if not _snapshot.available:
+            raise Exception("Error fetching data from PokeAPI: offline_only is set but no offline snapshot is configured")
+        raise Exception(f"Error fetching data from PokeAPI: [404] {endpoint} is not in the offline snapshot")
+
+    validators = entry.validators() if entry is not None else {}
+    # With a stale copy to fall back on, only wait briefly for the rate governor; otherwise queue for a slot
+    max_wait = _governor.stale_wait_seconds if entry is not None else None
+    try:
+        (status, data, size, etag, last_modified), shared = _upstream_flight.do(
+            (endpoint, tuple(sorted(validators.items()))), download_pokeapi, endpoint, validators, max_wait,
+        )
+    except RateLimitExceeded:
+        if entry is None:
+            raise
+        _governor.record_degraded()
+        record_fetch(endpoint, "stale")
+        return entry.data
+    record_fetch(endpoint, "coalesced" if shared else "revalidated" if status == 304 else "fetched")
+    if status == 304:
+        _cache.refresh(endpoint, entry, etag, last_modified)
+        return entry.data
+    return _cache.put(endpoint, data, size, etag, last_modified, fields, persist=False, remember=remember).data
+
+
+# Blocking PokeAPI calls run here so independent fetches overlap; sized to match the transport's connection pool
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="pokeapi")
+
+
+async def run_blocking(func, *args):
+    """
+    Run a blocking function on the shared PokeAPI thread pool without blocking the event loop.
+    :param func: Callable to run (e.g., get_pokeapi).
+    :param args: Positional arguments for func.
+    :return: The function's return value.
+    """
+    loop = asyncio.get_running_loop()
+    # Carry the caller's context into the pool thread so per-call metrics see the work done there
+    return await loop.run_in_executor(_executor, functools.partial(contextvars.copy_context().run, func, *args))
+
+
+async def get_pokeapi_async(endpoint: str, fields=None):
+    """
+    Awaitable get_pokeapi; shares the pooled transport and response cache with the synchronous version.
+    :param endpoint: PokeAPI endpoint (e.g., "pokemon/pikachu").
+    :param fields: Field paths or Record subclass the caller needs (see build_view), or None for the whole response.
+    :return: Decoded JSON response.
+    """
+    # Answer memory hits on the event loop: pool threads can be stuck waiting for the rate governor, and
+    # cached data must not queue behind them
+    entry = _cache.get_fresh(endpoint, fields)
+    if entry is not None:
+        record_fetch(endpoint, "cache_hit")
+        return entry.data
+    future, shared = _async_flight.submit(
+        (endpoint, fields), _executor, contextvars.copy_context().run, get_pokeapi, endpoint, fields,
+    )
+    # Shield the shared future so a cancelled caller does not cancel the fetch for everyone else waiting on it
+    data = await asyncio.shield(asyncio.wrap_future(future))
+    if shared:
+        record_fetch(endpoint, "coalesced")
+    return data
+
+
+def format_api_param(name: str) -> str:
+    """
+    Format parameter names for PokeAPI by replacing spaces with dashes and converting to lowercase.
+    Punctuation PokeAPI leaves out of names is dropped, accents are stripped and gender symbols spelled out.
+    :param name: The name to format (e.g., "Tapu Lele", "Mr. Mime", "Farfetch'd", "Nidoran♀", "Type: Null")
+    :return: Formatted name (e.g., "tapu-lele", "mr-mime", "farfetchd", "nidoran-f", "type-null")
+    """
+    name = name.replace("♀", "-f").replace("♂", "-m")
+    name = "".join(character for character in unicodedata.normalize("NFKD", name) if not unicodedata.combining(character))
+    name = name.lower().translate(NAME_PUNCTUATION)
+    return "-".join(part for part in name.replace("_", " ").replace(" ", "-").split("-") if part)
+
+
+# Dropped by format_api_param: PokeAPI writes "Mr. Mime" as mr-mime, "Farfetch'd" as farfetchd, "Type: Null" as type-null
+NAME_PUNCTUATION = str.maketrans("", "", ".'’:!?,()")
+
+# Resource kinds resolved locally by resolve_name before any request goes out
+NAME_INDEX_RESOURCES = ("pokemon", "pokemon-species", "ability", "item", "move", "egg-group", "version")
+
+# Spellings that normalization alone does not map onto the PokeAPI name
+NAME_ALIASES = {
+    "pokemon": {"nidoran-female": "nidoran-f", "nidoran-male": "nidoran-m", "mister-mime": "mr-mime", "mime-junior": "mime-jr"},
+    "pokemon-species": {"nidoran-female": "nidoran-f", "nidoran-male": "nidoran-m", "mister-mime": "mr-mime", "mime-junior": "mime-jr"},
+    "egg-group": {"water-1": "water1", "water-2": "water2", "water-3": "water3", "human-like": "humanshape",
+                  "amorphous": "indeterminate", "grass": "plant", "undiscovered": "no-eggs", "field": "ground"},
+}
+
+
+def name_trigrams(name: str) -> set:
+    padded = f"  {name} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Every name of one PokeAPI resource kind, built once from its list endpoint, with a trigram index
+    so misspelled names can be matched locally instead of costing a 404 round trip.
+    """
+
+    def __init__(self, kind: str, names: list):
+        self.kind = kind
+        self.names = list(dict.fromkeys(names))
+        self.known = set(self.names)
+        self.aliases = dict(NAME_ALIASES.get(kind, {}))
+        self.trigrams = {}
+        for position, name in enumerate(self.names):
+            for trigram in name_trigrams(name):
+                self.trigrams.setdefault(trigram, []).append(position)
+
+    def add_alias(self, alias: str, name: str):
+        if alias not in self.known:
+            self.aliases.setdefault(alias, name)
+
+    def lookup(self, name: str):
+        """
+        Exact or alias match of an already formatted name.
+        :return: The PokeAPI name, or None.
+        """
+        if name in self.known:
+            return name
+        alias = self.aliases.get(name)
+        return alias if alias in self.known else None
+
+    def suggest(self, name: str, limit: int = 3) -> list:
+        """
+        Closest names by trigram overlap, re-ranked by edit similarity.
+        :param name: Formatted name.
+        :param limit: Maximum number of suggestions.
+        :return: List of (similarity between 0 and 1, name) pairs, best first.
+        """
+        counts = {}
+        for trigram in name_trigrams(name):
+            for position in self.trigrams.get(trigram, ()):
+                counts[position] = counts.get(position, 0) + 1
+        shortlist = sorted(counts, key=counts.get, reverse=True)[:25]
+        scored = [(difflib.SequenceMatcher(None, name, self.names[position]).ratio(), self.names[position]) for position in shortlist]
+        scored.sort(key=lambda pair: (-pair[0], pair[1]))
+        return scored[:limit]
+
+
+class NameResolver:
+    """
+    Resolves user-supplied names to PokeAPI names through per-kind NameIndex instances: normalization,
+    aliases, then fuzzy matching. Names that cannot be resolved are remembered in a negative cache.
+    """
+
+    def __init__(self, min_similarity: float = 0.85, negative_ttl_seconds: float = 3600, failure_ttl_seconds: float = 60,
+                 negative_max_entries: int = 4096):
+        self.min_similarity = min_similarity
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self.negative_max_entries = negative_max_entries
+        self.stats = {"exact": 0, "alias": 0, "fuzzy": 0, "unresolved": 0, "negative_hits": 0, "unindexed": 0}
+        self._indexes = {}
+        # Oldest first, bounded by negative_max_entries, so a long-running worker does not keep every bad name forever
+        self._negative = OrderedDict()
+        # Kinds whose list endpoint could not be fetched, with the time to try again
+        self._failed = {}
+        self._lock = threading.Lock()
+
+    def index(self, kind: str):
+        """
+        The NameIndex for a resource kind, built from its list endpoint on first use.
+        :param kind: Resource kind (e.g., "pokemon").
+        :return: NameIndex, or None if the list endpoint could not be fetched (now or within failure_ttl_seconds).
+        """
+        with self._lock:
+            if kind in self._indexes:
+                return self._indexes[kind]
+            # While PokeAPI is down, do not make every call wait for the list endpoint's retries first
+            if self._failed.get(kind, 0) > time.time():
+                return None
+        try:
+            results = get_pokeapi(f"{kind}?limit=100000", ("results",)).get("results", [])
+        except Exception:
+            # Without an index names are passed through as formatted, exactly as before the index existed
+            with self._lock:
+                self._failed[kind] = time.time() + self.failure_ttl_seconds
+            return None
+        index = NameIndex(kind, [result["name"] for result in results])
+        if kind == "pokemon":
+            self._add_species_aliases(index, results)
+        with self._lock:
+            return self._indexes.setdefault(kind, index)
+
+    @staticmethod
+    def _add_species_aliases(index, results: list):
+        """
+        Make Pokémon whose default form carries a suffix ("deoxys-normal") reachable by their species name.
+        Only species names become aliases: a shared prefix such as "tapu" or "charizard-mega" stays ambiguous
+        and goes to suggestions instead of silently picking one Pokémon.
+        """
+        try:
+            species = get_pokeapi("pokemon-species?limit=100000", ("results",)).get("results", [])
+        except Exception:
+            return
+        # A species and its default variety share an id
+        by_id = {result["url"].rstrip("/").rsplit("/", 1)[-1]: result["name"] for result in results}
+        for result in species:
+            name = by_id.get(result["url"].rstrip("/").rsplit("/", 1)[-1])
+            if name is not None and name.startswith(f"{result['name']}-"):
+                index.add_alias(result["name"], name)
+
+    def resolve(self, kind: str, name: str) -> str:
+        """
+        Resolve a name for a resource kind without contacting PokeAPI (once the kind's index is built).
+        :param kind: Resource kind (e.g., "pokemon", "ability").
+        :param name: Name as written by the user or model (e.g., "Mr. Mime", "pikchu").
+        :return: The PokeAPI name.
+        """
+        formatted = format_api_param(name)
+        if kind not in NAME_INDEX_RESOURCES or formatted.isdigit():
+            return formatted
+        index = self.index(kind)
+        if index is None:
+            self.stats["unindexed"] += 1
+            return formatted
+
+        resolved = index.lookup(formatted)
+        if resolved is not None:
+            self.stats["exact" if resolved == formatted else "alias"] += 1
+            return resolved
+        if kind == "pokemon-species":
+            # A form name ("raichu-alola", "deoxys-normal") belongs to the species named by its leading part
+            parts = formatted.split("-")
+            for end in range(len(parts) - 1, 0, -1):
+                resolved = index.lookup("-".join(parts[:end]))
+                if resolved is not None:
+                    self.stats["alias"] += 1
+                    return resolved
+
+        with self._lock:
+            negative = self._negative.get((kind, formatted))
+        if negative is not None and negative[0] > time.time():
+            self.stats["negative_hits"] += 1
+            raise ValueError(negative[1])
+
+        suggestions = index.suggest(formatted)
+        # A longer name that merely starts with the query ("nidoran" -> nidoran-f) is another Pokémon or form,
+        # not a typo, so it is only suggested
+        if suggestions and suggestions[0][0] >= self.min_similarity and not suggestions[0][1].startswith(f"{formatted}-"):
+            self.stats["fuzzy"] += 1
+            return suggestions[0][1]
+
+        self.stats["unresolved"] += 1
+        message = f"Unknown {kind.replace('-', ' ')} '{name}'."
+        if suggestions:
+            message += f" Did you mean: {', '.join([suggestion for _, suggestion in suggestions])}?"
+        with self._lock:
+            self._negative.pop((kind, formatted), None)
+            self._negative[(kind, formatted)] = (time.time() + self.negative_ttl_seconds, message)
+            # Entries share one TTL, so the oldest also expire first
+            while self._negative and (len(self._negative) > self.negative_max_entries or next(iter(self._negative.values()))[0] <= time.time()):
+                self._negative.popitem(last=False)
+        raise ValueError(message)
+
+
+_names = NameResolver()
+
+
+def resolve_name(kind: str, name: str) -> str:
+    """
+    Resolve a user-supplied name to its PokeAPI name using the local name index.
+    :param kind: Resource kind (e.g., "pokemon", "pokemon-species", "ability", "item", "egg-group").
+    :param name: Name as written by the user or model.
+    :return: The PokeAPI name; raises ValueError with suggestions when nothing matches.
+    """
+    return _names.resolve(kind, name)
+
+
+async def resolve_name_async(kind: str, name: str) -> str:
+    return await run_blocking(resolve_name, kind, name)
+
+
+def get_name_resolution_stats() -> dict:
+    return dict(_names.stats)
+
+
+DEFAULT_INVERSE_INDEX_PATH = os.path.join(os.path.dirname(DEFAULT_CACHE_PATH), "inverse-index.bin")
+
+
+class Interner:
+    """
+    Maps names to dense integer ids and back, so postings can store small integers instead of strings.
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+    def id(self, name: str) -> int:
+        identifier = self.ids.get(name)
+        if identifier is None:
+            identifier = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return identifier
+
+
+class InverseIndex:
+    """
+    Reverse lookups built in one bulk pass over every Pokémon: move + version group -> learners,
+    location area + version -> encounters, and type -> Pokémon. Names are interned to integer ids and
+    postings are array-backed, so reverse queries answer from memory without any per-Pokémon fetch.
+    """
+
+    # Learner postings pack (pokemon, learn method, level) into one unsigned 32-bit integer
+    METHOD_SHIFT = 7
+    POKEMON_SHIFT = 12
+    LEVEL_MASK = (1 << METHOD_SHIFT) - 1
+    METHOD_MASK = (1 << (POKEMON_SHIFT - METHOD_SHIFT)) - 1
+    # Encounter postings are runs of (pokemon, method, min level, max level, chance)
+    ENCOUNTER_STRIDE = 5
+    # Pokémon ids are also stored in unsigned 16-bit type and encounter postings
+    POKEMON_LIMIT = 1 << 16
+
+    def __init__(self, path: str = DEFAULT_INVERSE_INDEX_PATH):
+        self.path = path
+        self.pokemon = Interner()
+        self.moves = Interner()
+        self.version_groups = Interner()
+        self.versions = Interner()
+        self.areas = Interner()
+        # Learn methods get their own interner: learner postings only have METHOD_MASK bits for them,
+        # while PokeAPI has several dozen encounter methods
+        self.learn_methods = Interner()
+        self.encounter_methods = Interner()
+        self.types = Interner()
+        self.learners = {}
+        self.encounters = {}
+        self.by_type = {}
+        self.indexed = set()
+        self.complete = False
+        # When the last complete pass over every Pokémon started, and the version groups PokeAPI listed then
+        self.built_at = 0.0
+        self.known_version_groups = []
+        self.progress = {"total": 0, "done": 0, "failed": 0, "building": False}
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._update_started = False
+        self._retry_at = 0.0
+        # Changes whenever postings are added, removed or loaded, so derived data knows when to rebuild
+        self.generation = next(self._generations)
+
+    def configure(self, path: str):
+        """
+        Point the index at another file. The in-memory index is dropped unless a build is running.
+        :param path: File the index is saved to and loaded from. Empty keeps it in memory only.
+        """
+        with self._lock:
+            if path != self.path and not self.progress["building"]:
+                self.__init__(path)
+
+    INTERNERS = ("pokemon", "moves", "version_groups", "versions", "areas", "learn_methods", "encounter_methods", "types")
+    POSTINGS = ("learners", "encounters", "by_type")
+    # Shared by every instance so a reconfigured index never reuses an earlier generation
+    _generations = itertools.count()
+    # Seconds before a failed or partial background build is started again
+    BUILD_RETRY_SECONDS = 60
+    # Seconds between background checks for new Pokémon and new version groups once the index is complete
+    REFRESH_CHECK_SECONDS = 24 * 3600
+    # Age after which every Pokémon is fetched again, so moves added to existing Pokémon reach the index
+    MAX_AGE_SECONDS = 30 * 24 * 3600
+    # Bumped whenever the saved layout changes; files in another format are ignored and rebuilt
+    FORMAT = 4
+    MAGIC = b"POKEPROF-INVERSE-INDEX\n"
+    HEADER_LENGTH = struct.Struct("<I")
+
+    def _serialize(self) -> bytes:
+        """
+        The saved layout: MAGIC, the length of a JSON header, the header (names, flags and the key, typecode and
+        byte length of every posting array), then the raw bytes of every posting array in header order. Loading it
+        never runs code, unlike pickle, and does not depend on which module wrote it.
+        """
+        header = {
+            "format": self.FORMAT, "indexed": sorted(self.indexed), "complete": self.complete, "built_at": self.built_at,
+            "known_version_groups": self.known_version_groups,
+        }
+        header.update({name: getattr(self, name).names for name in self.INTERNERS})
+        blobs = []
+        for name in self.POSTINGS:
+            header[name] = []
+            for key, postings in getattr(self, name).items():
+                blob = postings.tobytes()
+                header[name].append([list(key) if isinstance(key, tuple) else key, postings.typecode, len(blob)])
+                blobs.append(blob)
+        encoded = json.dumps(header, separators=(",", ":")).encode()
+        return b"".join([self.MAGIC, self.HEADER_LENGTH.pack(len(encoded)), encoded] + blobs)
+
+    def _restore(self, data: bytes):
+        if not data.startswith(self.MAGIC):
+            raise ValueError("Not an inverse index file")
+        start = len(self.MAGIC) + self.HEADER_LENGTH.size
+        (length,) = self.HEADER_LENGTH.unpack_from(data, len(self.MAGIC))
+        header = json.loads(data[start:start + length])
+        if header.get("format") != self.FORMAT:
+            raise ValueError(f"Unsupported inverse index format: {header.get('format')}")
+        offset = start + length
+        view = memoryview(data)
+        interners = {}
+        for name in self.INTERNERS:
+            interner = interners[name] = Interner()
+            for value in header[name]:
+                interner.id(value)
+        postings = {}
+        for name in self.POSTINGS:
+            postings[name] = {}
+            for key, typecode, size in header[name]:
+                values = postings[name][tuple(key) if isinstance(key, list) else key] = array(typecode)
+                values.frombytes(view[offset:offset + size])
+                offset += size
+        if offset != len(data):
+            raise ValueError("Truncated inverse index file")
+        for name, interner in interners.items():
+            setattr(self, name, interner)
+        for name, values in postings.items():
+            setattr(self, name, values)
+        self.indexed = set(header["indexed"])
+        self.complete = bool(header["complete"])
+        self.built_at = float(header["built_at"])
+        self.known_version_groups = list(header["known_version_groups"])
+        self.generation = next(self._generations)
+
+    def load(self) -> bool:
+        """
+        Load a previously saved index from disk (once). A file that cannot be read for any reason counts as no index.
+        :return: True if an index is available in memory.
+        """
+        with self._lock:
+            if not self._loaded and self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, "rb") as handle:
+                        self._restore(handle.read())
+                except Exception:
+                    # A damaged, outdated or foreign file is rebuilt rather than breaking reverse queries
+                    pass
+            self._loaded = True
+            return self.complete
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            state = self._serialize()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(state)
+        os.replace(temporary, self.path)
+
+    def add(self, raw_data_pokemon, raw_data_encounters):
+        """
+        Add one Pokémon's postings from its pokemon/ (name, moves, types) and pokemon/{name}/encounters responses.
+        """
+        with self._lock:
+            self.generation = next(self._generations)
+            pokemon_id = self.pokemon.id(raw_data_pokemon["name"])
+            # Check that every id fits its bit field before adding anything, so a rejected Pokémon leaves no postings
+            method_ids = [
+                self.learn_methods.id(version_detail["move_learn_method"]["name"])
+                for move in raw_data_pokemon.get("moves", [])
+                for version_detail in move["version_group_details"]
+            ]
+            if pokemon_id >= self.POKEMON_LIMIT:
+                raise ValueError(f"Inverse index is full: Pokémon id {pokemon_id} does not fit its postings")
+            if max(method_ids, default=0) > self.METHOD_MASK:
+                raise ValueError(f"Inverse index is full: learn method id {max(method_ids)} does not fit its postings")
+            for move in raw_data_pokemon.get("moves", []):
+                move_id = self.moves.id(move["move"]["name"])
+                for version_detail in move["version_group_details"]:
+                    key = (move_id, self.version_groups.id(version_detail["version_group"]["name"]))
+                    method_id = self.learn_methods.ids[version_detail["move_learn_method"]["name"]]
+                    posting = (
+                        pokemon_id << self.POKEMON_SHIFT
+                        | method_id << self.METHOD_SHIFT
+                        | min(version_detail["level_learned_at"] or 0, self.LEVEL_MASK)
+                    )
+                    self.learners.setdefault(key, array("I")).append(posting)
+
+            for type_info in raw_data_pokemon.get("types", []):
+                self.by_type.setdefault(self.types.id(type_info["type"]["name"]), array("H")).append(pokemon_id)
+
+            for encounter in raw_data_encounters or []:
+                area_id = self.areas.id(encounter["location_area"]["name"])
+                for version_detail in encounter["version_details"]:
+                    # Several encounter slots share a method, so fold them into one level range and total chance
+                    by_method = {}
+                    for detail in version_detail.get("encounter_details", []):
+                        method_id = self.encounter_methods.id(detail["method"]["name"])
+                        low, high, chance = by_method.get(method_id, (100, 0, 0))
+                        by_method[method_id] = (min(low, detail["min_level"]), max(high, detail["max_level"]), chance + detail["chance"])
+                    postings = self.encounters.setdefault((area_id, self.versions.id(version_detail["version"]["name"])), array("H"))
+                    for method_id, (low, high, chance) in by_method.items():
+                        postings.extend((pokemon_id, method_id, low, high, min(chance, 65535)))
+            self.indexed.add(pokemon_id)
+
+    def remove(self, names):
+        """
+        Drop every posting of the given Pokémon, so they can be re-indexed after their data changes.
+        :param names: Pokémon names.
+        """
+        with self._lock:
+            doomed = {self.pokemon.ids[name] for name in names if name in self.pokemon.ids}
+            if not doomed:
+                return
+            self.generation = next(self._generations)
+            for key, postings in self.learners.items():
+                self.learners[key] = array("I", [posting for posting in postings if posting >> self.POKEMON_SHIFT not in doomed])
+            for key, postings in self.by_type.items():
+                self.by_type[key] = array("H", [pokemon_id for pokemon_id in postings if pokemon_id not in doomed])
+            stride = self.ENCOUNTER_STRIDE
+            for key, postings in self.encounters.items():
+                kept = array("H")
+                for start in range(0, len(postings), stride):
+                    if postings[start] not in doomed:
+                        kept.extend(postings[start:start + stride])
+                self.encounters[key] = kept
+            self.indexed -= doomed
+
+    def build(self, names=None, refresh=(), workers: int = 4, checkpoint: int = 100):
+        """
+        Index every Pokémon not indexed yet, plus any listed in refresh. Safe to call repeatedly: it only
+        fetches what is missing, so it doubles as the incremental update after new Pokémon are released.
+        A full pass over a complete index that is older than MAX_AGE_SECONDS, or that predates a version group
+        PokeAPI now lists (a new game or DLC), fetches every Pokémon again instead (see rebuild).
+        :param names: Pokémon names to cover; defaults to the full pokemon list endpoint.
+        :param refresh: Already indexed Pokémon whose postings should be rebuilt.
+        :param workers: Concurrent fetches; kept low because this is background work.
+        :param checkpoint: Save to disk after this many newly indexed Pokémon.
+        :return: True if every Pokémon was indexed; the index is only marked complete then.
+        """
+        self.load()
+        started = time.time()
+        full = names is None
+        if full:
+            names = [result["name"] for result in get_pokeapi("pokemon?limit=100000", ("results",)).get("results", [])]
+            version_groups = [result["name"] for result in get_pokeapi("version-group?limit=100000", ("results",)).get("results", [])]
+            if self.complete and (started - self.built_at > self.MAX_AGE_SECONDS or set(version_groups) - set(self.known_version_groups)):
+                return self.rebuild(names, version_groups, workers)
+        self.remove(refresh)
+        with self._lock:
+            todo = [name for name in names if self.pokemon.ids.get(name) not in self.indexed]
+            self.progress.update(total=len(names), done=len(names) - len(todo), failed=0, building=True)
+        if not todo and not refresh:
+            if full and not self.complete:
+                self._mark_complete(started, version_groups)
+            self.progress["building"] = False
+            return True
+
+        def fetch(name):
+            # Bulk fetches bypass the memory tier so indexing does not flush entries interactive calls rely on,
+            # and queue behind interactive calls for the rate budget
+            with request_priority("background"):
+                return (
+                    get_pokeapi(f"pokemon/{name}", ("name", "moves", "types"), remember=False),
+                    get_pokeapi(f"pokemon/{name}/encounters", remember=False),
+                )
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pokeapi-index") as pool:
+                futures = {pool.submit(fetch, name): name for name in todo}
+                for count, future in enumerate(as_completed(futures), 1):
+                    try:
+                        self.add(*future.result())
+                        self.progress["done"] += 1
+                    except Exception:
+                        self.progress["failed"] += 1
+                    if count % checkpoint == 0:
+                        self.save()
+            # Pokémon that failed are still missing, so the next pass picks them up
+            succeeded = self.progress["failed"] == 0
+            if full and succeeded and not self.complete:
+                self._mark_complete(started, version_groups)
+            return succeeded
+        finally:
+            self.progress["building"] = False
+            self.save()
+
+    def _mark_complete(self, started: float, version_groups: list):
+        with self._lock:
+            self.complete = True
+            self.built_at = started
+            self.known_version_groups = sorted(version_groups)
+
+    def rebuild(self, names, version_groups, workers: int = 4) -> bool:
+        """
+        Fetch every Pokémon again into a separate index and swap it in once it is complete, so moves and
+        version groups added to existing Pokémon are picked up while reverse queries keep using the current index.
+        :param names: Every Pokémon name.
+        :param version_groups: Every version group PokeAPI lists now.
+        :return: True if the new index replaced the current one.
+        """
+        started = time.time()
+        fresh = InverseIndex(path="")
+        fresh._loaded = True
+        # Share the progress counters, so the build-index command and the pending message report this pass
+        fresh.progress = self.progress
+        if not fresh.build(names, workers=workers):
+            return False
+        with self._lock:
+            for name in self.INTERNERS + self.POSTINGS + ("indexed",):
+                setattr(self, name, getattr(fresh, name))
+            self.generation = next(self._generations)
+            self._mark_complete(started, version_groups)
+        self.save()
+        return True
 
-def get_pokeapi(endpoint: str):
-    url = f"https://pokeapi.co/api/v2/{endpoint}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    else:
-        raise Exception(f"Error fetching data from PokeAPI: [{response.status_code}] {response.text}")
+    def ensure(self) -> bool:
+        """
+        Make the index available: load it from disk and start a background pass that indexes any Pokémon
+        still missing (everything, the first time) and refreshes a stale index. A pass that fails or leaves
+        Pokémon out is started again by a later call after BUILD_RETRY_SECONDS, a successful one after
+        REFRESH_CHECK_SECONDS, so long-running workers pick up new Pokémon and games too.
+        :return: True if reverse queries can be answered now.
+        """
+        self.load()
+        with self._lock:
+            if not self._update_started and time.monotonic() >= self._retry_at:
+                self._update_started = True
+                self.progress["building"] = True
+                threading.Thread(target=self._background_build, name="pokeapi-inverse-index", daemon=True).start()
+        return self.complete
 
-def format_api_param(name: str) -> str:
+    def _background_build(self):
+        try:
+            with request_priority("background"):
+                succeeded = self.build()
+        except Exception:
+            succeeded = False
+            self.progress["building"] = False
+        # A failed pass is retried soon, once PokeAPI is reachable again, instead of waiting for a restart
+        with self._lock:
+            self._retry_at = time.monotonic() + (self.REFRESH_CHECK_SECONDS if succeeded else self.BUILD_RETRY_SECONDS)
+            self._update_started = False
+
+    def move_learners(self, move_name: str, version_groups=None) -> dict:
+        """
+        Pokémon that learn a move, optionally in the given version groups only (see version_groups_of).
+        :return: Mapping of Pokémon name to a list of (version group, learn method, level) tuples.
+        """
+        learners = {}
+        move_id = self.moves.ids.get(move_name)
+        if move_id is None:
+            return learners
+        with self._lock:
+            for version_group_id, version_group_name in enumerate(self.version_groups.names):
+                if version_groups is not None and version_group_name not in version_groups:
+                    continue
+                for posting in self.learners.get((move_id, version_group_id), ()):
+                    learners.setdefault(self.pokemon.names[posting >> self.POKEMON_SHIFT], []).append((
+                        version_group_name,
+                        self.learn_methods.names[(posting >> self.METHOD_SHIFT) & self.METHOD_MASK],
+                        posting & self.LEVEL_MASK,
+                    ))
+        return learners
+
+    def find_version_groups(self, version_groups) -> list:
+        """
+        The indexed version groups among the given ones (see version_groups_of).
+        :return: Matching version group names.
+        """
+        with self._lock:
+            return [name for name in self.version_groups.names if name in version_groups]
+
+    def find_areas(self, location: str) -> list:
+        """
+        Location areas matching a place name ("Route 119" matches hoenn-route-119-area).
+        :return: Matching location area names.
+        """
+        query = format_api_param(location)
+        if query in self.areas.ids:
+            return [query]
+        return [area for area in self.areas.names if f"-{query}-" in f"-{area}-"]
+
+    def location_encounters(self, areas: list, version: str = None) -> dict:
+        """
+        Encounters in the given location areas, optionally for one game version.
+        :return: Mapping of (area, version) to a list of (pokemon, method, min level, max level, chance) tuples.
+        """
+        version = format_api_param(version) if version else None
+        stride = self.ENCOUNTER_STRIDE
+        results = {}
+        with self._lock:
+            area_ids = {self.areas.ids[area] for area in areas if area in self.areas.ids}
+            for (area_id, version_id), postings in self.encounters.items():
+                version_name = self.versions.names[version_id]
+                if area_id not in area_ids or (version and version_name != version):
+                    continue
+                rows = results.setdefault((self.areas.names[area_id], version_name), [])
+                for start in range(0, len(postings), stride):
+                    pokemon_id, method_id, low, high, chance = postings[start:start + stride]
+                    rows.append((self.pokemon.names[pokemon_id], self.encounter_methods.names[method_id], low, high, chance))
+        return results
+
+    def pokemon_of_type(self, type_name: str) -> list:
+        with self._lock:
+            type_id = self.types.ids.get(format_api_param(type_name))
+            return [self.pokemon.names[pokemon_id] for pokemon_id in self.by_type.get(type_id, ())]
+
+    def type_postings(self) -> tuple:
+        """
+        Copy of the type postings for vectorized type matchups.
+        :return: Tuple of (generation, Pokémon names by id, mapping of type name to array of Pokémon ids).
+        """
+        with self._lock:
+            return self.generation, list(self.pokemon.names), {
+                self.types.names[type_id]: array("H", postings) for type_id, postings in self.by_type.items()
+            }
+
+
+_inverse_index = InverseIndex()
+
+
+def build_inverse_index(names=None, refresh=()):
     """
-    Format parameter names for PokeAPI by replacing spaces with dashes and converting to lowercase.
-    :param name: The name to format (e.g., "Tapu Lele")
-    :return: Formatted name (e.g., "tapu-lele")
+    Build or incrementally update the shared inverse index in the calling thread (e.g., from the CLI after ingest).
+    :param names: Pokémon names to cover; defaults to every Pokémon.
+    :param refresh: Pokémon whose postings should be rebuilt.
+    :return: True if every Pokémon was indexed.
+    """
+    return _inverse_index.build(names, refresh)
+
+
+def inverse_index_pending_message() -> str:
+    progress = _inverse_index.progress
+    return f"""
+The reverse lookup index is still being built ({progress['done']} of {progress['total'] or 'all'} Pokémon indexed). Tell the user this answer will be available in a few minutes, and offer to look up specific Pokémon instead.
+"""
+
+
+# The damage_relations lists that decide what a type's moves do to other types, with their multipliers
+DAMAGE_RELATIONS = (("double_damage_to", 2.0), ("half_damage_to", 0.5), ("no_damage_to", 0.0))
+TYPE_CHART_FIELDS = ("name",) + tuple(f"damage_relations.{relation}" for relation, _ in DAMAGE_RELATIONS)
+
+
+class TypeChart:
+    """
+    Damage multipliers between every pair of types as a NumPy matrix, built once from the type/ endpoints:
+    matrix[attacker, defender] is what a move of the attacking type does to a single-typed defender, and a
+    dual-typed defender takes the product of its two columns. The extra last row and column (none) are all
+    ones and stand in for a missing second type, so every defender is a (type, type) pair of indexes.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self.matrix = None
+        self._pokemon = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.matrix is not None
+
+    @property
+    def none(self) -> int:
+        return len(self.names)
+
+    def build(self, type_data: list):
+        """
+        :param type_data: type/ responses with TYPE_CHART_FIELDS.
+        """
+        # Types without damage relations (unknown, shadow, stellar) never decide a matchup, so they are left out
+        type_data = [data for data in type_data if any(data.get("damage_relations", {}).get(relation) for relation, _ in DAMAGE_RELATIONS)]
+        names = [data["name"] for data in type_data]
+        ids = {name: type_id for type_id, name in enumerate(names)}
+        matrix = np.ones((len(names) + 1, len(names) + 1), dtype=np.float32)
+        for data in type_data:
+            for relation, multiplier in DAMAGE_RELATIONS:
+                for target in data["damage_relations"].get(relation, []):
+                    if target["name"] in ids:
+                        matrix[ids[data["name"]], ids[target["name"]]] = multiplier
+        with self._lock:
+            self.names, self.ids, self.matrix, self._pokemon = names, ids, matrix, None
+
+    def pair(self, type_names: list) -> tuple:
+        """
+        :param type_names: One or two type names.
+        :return: (type index, type index or none).
+        """
+        type_ids = [self.ids[name] for name in type_names]
+        return type_ids[0], type_ids[1] if len(type_ids) > 1 else self.none
+
+    def defense(self, first, second) -> np.ndarray:
+        """
+        Multipliers every attacking type deals to defenders.
+        :param first: Primary type index, or an array of them.
+        :param second: Secondary type index (none for single-typed), or an array of them.
+        :return: Array of shape (attacking types,) or (defenders, attacking types).
+        """
+        return (self.matrix[:-1, first] * self.matrix[:-1, second]).T
+
+    def offense(self, attacking, first, second) -> np.ndarray:
+        """
+        Best multiplier any of the attacking types deals to each defender.
+        :param attacking: Array of attacking type indexes (e.g., the types of a movepool's damaging moves).
+        :param first: Array of defender primary type indexes.
+        :param second: Array of defender secondary type indexes.
+        :return: Array of shape (defenders,).
+        """
+        rows = self.matrix[np.asarray(attacking)]
+        return (rows[:, first] * rows[:, second]).max(axis=0)
+
+    def pokemon(self, index) -> tuple:
+        """
+        Types of every Pokémon in the inverse index as parallel arrays, rebuilt only when the index changes.
+        :param index: InverseIndex to read the type postings from.
+        :return: Tuple of (names array, primary type indexes, secondary type indexes or none).
+        """
+        cached = self._pokemon
+        if cached is not None and cached[0] == index.generation:
+            return cached[1]
+        generation, names, postings = index.type_postings()
+        pokemon_ids = np.concatenate([np.frombuffer(ids, dtype=np.uint16) for name, ids in postings.items() if name in self.ids] or [np.empty(0, np.uint16)])
+        type_ids = np.concatenate([np.full(len(ids), self.ids[name]) for name, ids in postings.items() if name in self.ids] or [np.empty(0, int)])
+        # Postings are grouped by type, so after a stable sort by Pokémon the first posting of each Pokémon
+        # is one type and a second posting, if any, the other (order does not matter for products)
+        order = np.argsort(pokemon_ids, kind="stable")
+        pokemon_ids, type_ids = pokemon_ids[order], type_ids[order]
+        first_posting = np.ones(len(pokemon_ids), dtype=bool)
+        first_posting[1:] = pokemon_ids[1:] != pokemon_ids[:-1]
+        first = np.full(len(names), self.none)
+        second = np.full(len(names), self.none)
+        first[pokemon_ids[first_posting]] = type_ids[first_posting]
+        second[pokemon_ids[~first_posting]] = type_ids[~first_posting]
+        typed = first != self.none
+        result = (np.array(names, dtype=object)[typed], first[typed], second[typed])
+        self._pokemon = (generation, result)
+        return result
+
+    def rank_against(self, team_first, team_second, first, second) -> np.ndarray:
+        """
+        Score defenders by how their typing matches up against a team, assuming same-type moves on both sides:
+        the mean over team members of log2(best multiplier the defender deals) minus log2(worst multiplier it takes).
+        Immunities count as quarter damage so a single immunity does not outweigh every other matchup.
+        :param team_first: Array of the team's primary type indexes.
+        :param team_second: Array of the team's secondary type indexes (none for single-typed).
+        :param first: Array of candidate primary type indexes.
+        :param second: Array of candidate secondary type indexes.
+        :return: Array of scores, one per candidate; higher means a stronger matchup against the team.
+        """
+        # A single-typed attacker has only its first type to attack with, not the neutral none row
+        attacking_second = np.where(second == self.none, first, second)
+        team_attacking_second = np.where(team_second == self.none, team_first, team_second)
+        team_defense = self.defense(team_first, team_second)
+        dealt = np.maximum(team_defense[:, first], team_defense[:, attacking_second])
+        candidate_defense = self.defense(first, second)
+        taken = np.maximum(candidate_defense[:, team_first], candidate_defense[:, team_attacking_second]).T
+        return (np.log2(np.maximum(dealt, 0.25)) - np.log2(np.maximum(taken, 0.25))).mean(axis=0)
+
+
+_type_chart = TypeChart()
+
+
+async def load_type_chart() -> TypeChart:
     """
-    return name.lower().replace(" ", "-")
+    Build the shared type chart on first use; the type/ responses come from the response cache afterwards.
+    :return: The loaded TypeChart.
+    """
+    if not _type_chart.loaded:
+        listing = await get_pokeapi_async("type?limit=100000", ("results",))
+        type_data = await asyncio.gather(*(get_pokeapi_async(f"type/{result['name']}", TYPE_CHART_FIELDS) for result in listing.get("results", [])))
+        _type_chart.build(type_data)
+    return _type_chart
+
+
+def format_multiplier(multiplier: float) -> str:
+    return {0.25: "¼×", 0.5: "½×"}.get(float(multiplier), f"{float(multiplier):g}×")
+
+
+SPRITE_KEYS = ("front_default", "front_male", "front_female", "front_shiny", "front_shiny_male", "front_shiny_female")
+FORM_SPRITE_FIELDS = tuple(f"sprites.{sprite}" for sprite in SPRITE_KEYS)
+
+
+class PokemonRecord(Record):
+    """
+    What the Pokémon prompts read from a pokemon/ response; moves, game indices and the sprite archive are dropped.
+    """
+    __slots__ = ("name", "id", "height", "weight", "stats", "types", "abilities", "forms", "sprites")
+
+    @classmethod
+    def from_json(cls, data):
+        record = cls()
+        record.name = data.get("name")
+        record.id = data.get("id")
+        record.height = data.get("height")
+        record.weight = data.get("weight")
+        record.stats = tuple((sys.intern(stat["stat"]["name"]), stat["base_stat"]) for stat in data.get("stats", []))
+        record.types = tuple(sys.intern(type_info["type"]["name"]) for type_info in data.get("types", []))
+        record.abilities = tuple((ability["ability"]["name"], ability.get("is_hidden", False)) for ability in data.get("abilities", []))
+        record.forms = tuple(form["name"] for form in data.get("forms", []))
+        sprites = data.get("sprites") or {}
+        record.sprites = {sprite: sprites[sprite] for sprite in SPRITE_KEYS if sprites.get(sprite)}
+        return record
+
+
+class SpeciesRecord(Record):
+    """
+    What the Pokémon prompts read from a pokemon-species/ response: status flags, egg groups, the evolution chain
+    endpoint and the distinct English Pokédex entries (the response repeats them per game and language).
+    """
+    __slots__ = ("is_legendary", "is_mythical", "is_baby", "flavor_texts", "egg_groups", "evolution_chain")
+
+    @classmethod
+    def from_json(cls, data):
+        record = cls()
+        record.is_legendary = data.get("is_legendary", False)
+        record.is_mythical = data.get("is_mythical", False)
+        record.is_baby = data.get("is_baby", False)
+        record.flavor_texts = tuple(dict.fromkeys(
+            entry["flavor_text"] for entry in data.get("flavor_text_entries", []) if entry["language"]["name"] == "en"
+        ))
+        record.egg_groups = tuple(sys.intern(egg_group["name"]) for egg_group in data.get("egg_groups", []))
+        record.evolution_chain = evolution_chain_endpoint(data)
+        return record
+
+
+class MoveTable(Record):
+    """
+    A Pokémon's learnset as parallel arrays of (version group, learn method, level, move), one row per way a move
+    is learned, sorted the way movelists are rendered. Names are interned process-wide, so a row costs 5 bytes
+    instead of the nested dictionaries of moves[].version_group_details.
+    """
+    __slots__ = ("version_groups", "methods", "levels", "moves")
+
+    move_names = Interner()
+    move_titles = []
+    version_group_names = Interner()
+    method_names = Interner()
+    _lock = threading.Lock()
+
+    @classmethod
+    def from_json(cls, data):
+        rows = []
+        with cls._lock:
+            for move in data.get("moves", []):
+                move_id = cls.move_names.id(move["move"]["name"])
+                if move_id == len(cls.move_titles):
+                    cls.move_titles.append(move["move"]["name"].replace("-", " ").title())
+                for version_detail in move["version_group_details"]:
+                    rows.append((
+                        cls.version_group_names.id(version_detail["version_group"]["name"]),
+                        cls.method_names.id(version_detail["move_learn_method"]["name"]),
+                        min(version_detail["level_learned_at"] or 0, 255),
+                        move_id,
+                    ))
+            version_group_names, method_names, titles = cls.version_group_names.names, cls.method_names.names, cls.move_titles
+            rows.sort(key=lambda row: (version_group_names[row[0]], method_names[row[1]], row[2], titles[row[3]]))
+        record = cls()
+        record.version_groups = array("B", [row[0] for row in rows])
+        record.methods = array("B", [row[1] for row in rows])
+        record.levels = array("B", [row[2] for row in rows])
+        record.moves = array("H", [row[3] for row in rows])
+        return record
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def rows(self):
+        """
+        :return: Iterator of (version group, learn method, level, move title) tuples; level is 0 unless learned by level-up.
+        """
+        version_group_names, method_names, titles = self.version_group_names.names, self.method_names.names, self.move_titles
+        for version_group_id, method_id, level, move_id in zip(self.version_groups, self.methods, self.levels, self.moves):
+            yield version_group_names[version_group_id], method_names[method_id], level, titles[move_id]
+
+# Resources each tool renders from, and the fields or Record it reads from each of them (None keeps the whole response).
+# A resource with an "option" is an optional section, fetched only when the tool is called with that parameter set.
+# Tools that read the same resource share views so they also share cached entries and in-flight fetches.
+TOOL_RESOURCE_PLANS = {
+    "get_pokemon_details": {
+        "pokemon": {"fields": PokemonRecord},
+        "pokemon-species": {"fields": SpeciesRecord},
+        "evolution-chain": {"fields": ("chain",)},
+        "pokemon-form": {"fields": ("name", "is_default", "is_battle_only", "is_mega", "types") + FORM_SPRITE_FIELDS, "option": "include_forms"},
+    },
+    "get_team_details": {
+        "pokemon": {"fields": PokemonRecord},
+        "pokemon-species": {"fields": SpeciesRecord},
+        "evolution-chain": {"fields": ("chain",)},
+    },
+    "get_ability_details": {
+        "ability": {"fields": ("name", "effect_entries", "pokemon")},
+    },
+    "get_pokemon_location": {
+        "pokemon-encounters": {"fields": None},
+    },
+    "get_egg_groups": {
+        "egg-group": {"fields": ("name", "pokemon_species")},
+    },
+    "get_pokemon_movelist": {
+        "pokemon": {"fields": MoveTable},
+        "generation": {"fields": ("version_groups",), "option": "generation"},
+    },
+    "get_type_matchups": {
+        "type": {"fields": TYPE_CHART_FIELDS},
+    },
+    "get_movepool_coverage": {
+        "type": {"fields": TYPE_CHART_FIELDS},
+        "move": {"fields": ("name", "type", "damage_class")},
+    },
+    "get_team_coverage": {
+        "type": {"fields": TYPE_CHART_FIELDS},
+        "pokemon": {"fields": PokemonRecord},
+    },
+    "get_item": {
+        "item": {"fields": ("id", "name", "cost", "fling_power", "fling_effect", "attributes", "category", "effect_entries",
+                            "flavor_text_entries", "game_indices", "names", "sprites.default", "held_by_pokemon", "baby_trigger_for")},
+    },
+}
+
+
+def plan_resources(tool_name: str, **options) -> dict:
+    """
+    Decide which resources a tool call has to fetch and which fields it needs from each.
+    :param tool_name: Name of the Tools method (e.g., "get_pokemon_details").
+    :param options: Parameters of the call that switch optional sections on (e.g., include_forms=True).
+    :return: Dictionary mapping resource name to the fields to keep; optional resources that are off are left out.
+    """
+    return {
+        resource: spec["fields"]
+        for resource, spec in TOOL_RESOURCE_PLANS[tool_name].items()
+        if not spec.get("option") or options.get(spec["option"])
+    }
 
 
 def process_evolution_chain(chain_data, evolution_list):
@@ -60,10 +2437,177 @@ def process_evolution_chain(chain_data, evolution_list):
         # Recursively process the next evolution stage
         process_evolution_chain(evolution, evolution_list)
 
-def get_pokemon_alternate_forms(pokemon_form_name: str):
+def process_pokemon(pokemon: PokemonRecord):
+    """
+    Extract the details rendered by the Pokémon prompts from a pokemon/ record.
+    :param pokemon: PokemonRecord of the pokemon/ response.
+    :return: Dictionary of processed Pokémon details.
+    """
+    sprites = pokemon.sprites
+    return {
+        "name": pokemon.name,
+        "id": pokemon.id,
+        "sprite": sprites.get("front_default", "No sprite available"),
+        "sprite_male": sprites.get("front_male") or sprites.get("front_default", "No sprite available"),
+        "sprite_female": sprites.get("front_female") or sprites.get("front_default", "No sprite available"),
+        "sprite_shiny": sprites.get("front_shiny", "No shiny sprite available"),
+        "sprite_shiny_male": sprites.get("front_shiny_male") or sprites.get("front_shiny", "No shiny sprite available"),
+        "sprite_shiny_female": sprites.get("front_shiny_female") or sprites.get("front_shiny", "No shiny sprite available"),
+        "height": f"{pokemon.height / 10:.1f} meters",
+        "weight": f"{pokemon.weight / 10:.1f} kg",
+        "stats": dict(pokemon.stats),
+        "type": list(pokemon.types),
+        "abilities": [{"name": name, "hidden": hidden} for name, hidden in pokemon.abilities],
+        "forms": list(pokemon.forms)
+    }
+
+
+def process_species(species: SpeciesRecord):
+    """
+    Extract the details rendered by the Pokémon prompts from a pokemon-species/ record.
+    :param species: SpeciesRecord of the pokemon-species/ response.
+    :return: Dictionary of processed species details.
+    """
+    return {
+        "is_legendary": species.is_legendary,
+        "is_mythical": species.is_mythical,
+        "is_baby": species.is_baby,
+        "flavor_text_descriptions": species.flavor_texts,
+        "egg_groups": list(species.egg_groups),
+    }
+
+
+def process_pokemon_details(pokemon: PokemonRecord, species: SpeciesRecord):
+    """
+    Extract the details rendered by the Pokémon prompts from the pokemon/ and pokemon-species/ records.
+    :param pokemon: PokemonRecord of the pokemon/ response.
+    :param species: SpeciesRecord of the pokemon-species/ response.
+    :return: Dictionary of processed Pokémon details.
+    """
+    return {**process_pokemon(pokemon), **process_species(species)}
+
+
+def evolution_chain_endpoint(raw_data_species) -> str:
+    return f"evolution-chain/{raw_data_species.get('evolution_chain', {}).get('url', '').split('/')[-2]}"
+
+
+def process_evolution_data(raw_data_evolution):
+    """
+    Flatten an evolution-chain/ response into its base form and every later stage.
+    :param raw_data_evolution: evolution-chain/ response.
+    :return: Dictionary with "base_form" and a list of "evolutions".
+    """
+    processed_evolution_data = {
+        "base_form": raw_data_evolution.get("chain", {}).get("species", {}).get("name", "Unknown"),
+        "evolutions": []
+    }
+    process_evolution_chain(raw_data_evolution.get("chain", {}), processed_evolution_data["evolutions"])
+    return processed_evolution_data
+
+
+def build_stats_table(rows, label: str = None) -> str:
+    """
+    Render base stats as a markdown table with a Total column.
+    :param rows: List of (name, stats dictionary) pairs; the stat columns come from the first row.
+    :param label: Header of a leading name column, or None to leave the column out (single Pokémon).
+    :return: Markdown table.
+    """
+    stat_names = list(rows[0][1].keys()) if rows else []
+    lead = f"| {label} " if label else ""
+    lines = [
+        lead + "| " + " | ".join([stat_name.replace("-", " ").title() for stat_name in stat_names]) + " | Total |",
+        ("|---" if label else "") + "|" + "---|" * (len(stat_names) + 1),
+    ]
+    for name, stats in rows:
+        lead = f"| {name} " if label else ""
+        lines.append(lead + "| " + " | ".join([str(stats.get(stat_name, "N/A")) for stat_name in stat_names]) + f" | {sum(stats.values())} |")
+    return "\n".join(lines)
+
+
+ROMAN_NUMERALS = {"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7, "viii": 8, "ix": 9, "x": 10}
+
+# Rough size of a token, used to turn a token budget into a character budget for rendered output
+CHARS_PER_TOKEN = 4
+
+
+def generation_endpoint(generation: str) -> str:
+    """
+    Turn a loosely written generation ("4", "IV", "Gen 4", "generation-iv") into its PokeAPI endpoint.
+    :param generation: Generation as written by the user or model.
+    :return: Endpoint such as "generation/4".
+    """
+    name = format_api_param(str(generation)).replace("generation", "").replace("gen", "").strip("-")
+    if name in ROMAN_NUMERALS:
+        return f"generation/{ROMAN_NUMERALS[name]}"
+    digits = "".join(character for character in name if character.isdigit())
+    return f"generation/{int(digits)}" if digits else f"generation/generation-{name}"
+
+
+def version_groups_of(query: str) -> set:
+    """
+    Version groups a game or version group name refers to: a version group by its own name ("scarlet-violet";
+    pairs written with a slash or ampersand, "Scarlet/Violet" or "Sword & Shield", match like dashed names), or the
+    version group of one game ("scarlet", "Ultra Sun", "HeartGold"), looked up through the version/ endpoint.
+    Only whole version names match, so "diamond" is diamond-pearl and never brilliant-diamond-and-shining-pearl.
+    :param query: Game or version group as written by the user or model.
+    :return: Set of version group names; a name PokeAPI does not know simply matches nothing.
+    """
+    query = "-".join([part for part in format_api_param(query.replace("/", " ").replace("&", " ")).split("-") if part])
+    version_groups = {query}
+    index = _names.index("version")
+    version = index and (index.lookup(query) or index.lookup(query.replace("-", "")))
+    if version:
+        version_groups.add(get_pokeapi(f"version/{version}", ("version_group",))["version_group"]["name"])
+    return version_groups
+
+
+def render_movelist(moves_by_version: dict, max_chars: int = 0):
+    """
+    Render one markdown table per version group, within an output budget. Once a table no longer fits,
+    it and the remaining version groups are summarized as move counts per learn method instead.
+    :param moves_by_version: Mapping of version group name to a list of move dictionaries.
+    :param max_chars: Character budget for the tables; 0 means unlimited.
+    :return: Tuple of (rendered tables, summary lines for version groups that did not fit).
+    """
+    tables = []
+    summaries = []
+    used = 0
+    for version_group, moves in sorted(moves_by_version.items()):
+        title = version_group.replace("-", " ").title()
+        if not summaries:
+            # Sort moves: first by learn method, then by level (if applicable), then by name
+            moves.sort(key=lambda x: (x["learn_method"], x["level_learned_at"] if x["level_learned_at"] else 0, x["name"]))
+            lines = [f"### {title}", "", "| Move | Learn Method | Level |", "|------|-------------|-------|"]
+            for move in moves:
+                level = str(move["level_learned_at"]) if move["level_learned_at"] else "N/A"
+                lines.append(f"| {move['name']} | {move['learn_method'].replace('-', ' ').title()} | {level} |")
+            lines.append("")
+            table = "\n".join(lines)
+
+            if not max_chars or used + len(table) <= max_chars:
+                tables.append(table)
+                used += len(table)
+                continue
+            if not tables:
+                # A first table larger than the whole budget is cut short rather than dropped
+                table = table[:table.rfind("\n", 0, max_chars)]
+                omitted = len(moves) - (table.count("\n") - 3)
+                tables.append(f"{table}\n\n*{omitted} more moves omitted to keep this response short.*\n")
+                used = max_chars
+                continue
+
+        methods = {}
+        for move in moves:
+            methods[move["learn_method"]] = methods.get(move["learn_method"], 0) + 1
+        summaries.append(f"- {title}: {len(moves)} moves ({', '.join([f'{count} {method}' for method, count in sorted(methods.items())])})")
+    return tables, summaries
+
+
+def get_pokemon_alternate_forms(pokemon_form_name: str, fields=None):
     """
     Fetches alternate forms of a Pokémon by its name.
     :param pokemon_name: Name of the Pokémon (case-insensitive).
+    :param fields: Field paths to keep from the pokemon-form response (see project_fields), or None for all of them.
     :return: JSON response containing alternate forms.
     """
     if not isinstance(pokemon_form_name, str):
@@ -71,7 +2615,7 @@ def get_pokemon_alternate_forms(pokemon_form_name: str):
         
     formatted_name = format_api_param(pokemon_form_name)
     endpoint = f"pokemon-form/{formatted_name}"
-    raw_data = get_pokeapi(endpoint)
+    raw_data = get_pokeapi(endpoint, fields)
 
     # Process and return the relevant alternate forms
     form_data = {
@@ -110,60 +2654,126 @@ def get_pokemon_alternate_forms(pokemon_form_name: str):
 
 class Tools:
 
+    class Valves(BaseModel):
+        pokeapi_base_url: str = Field(default=POKEAPI_BASE_URL, description="Base URL of the PokeAPI (or a compatible mirror).")
+        connect_timeout: float = Field(default=3.05, description="Seconds to wait for a connection to PokeAPI.")
+        read_timeout: float = Field(default=10.0, description="Seconds to wait for PokeAPI to send a response.")
+        max_retries: int = Field(default=3, description="Retries for connection errors, timeouts, 429 and 5xx responses.")
+        backoff_factor: float = Field(default=0.5, description="Base delay in seconds for jittered exponential backoff between retries.")
+        cache_enabled: bool = Field(default=True, description="Cache PokeAPI responses in memory and on disk.")
+        cache_ttl_seconds: int = Field(default=7 * 24 * 3600, description="Seconds before a cached response is revalidated with PokeAPI.")
+        cache_max_entries: int = Field(default=1024, description="Maximum number of responses kept in the in-memory cache.")
+        cache_max_memory_mb: int = Field(default=64, description="Maximum size in MB of responses kept in the in-memory cache.")
+        cache_disk_path: str = Field(default=DEFAULT_CACHE_PATH, description="SQLite file shared by all workers. Leave empty to disable the disk cache.")
+        cache_disk_max_mb: int = Field(default=512, description="Maximum size in MB of compressed responses kept in the disk cache.")
+        offline_snapshot_path: str = Field(default="", description="Offline PokeAPI snapshot built with the ingest command. Leave empty to always use the network.")
+        offline_only: bool = Field(default=False, description="Never contact PokeAPI; endpoints missing from the snapshot fail instead.")
+        inverse_index_path: str = Field(default=DEFAULT_INVERSE_INDEX_PATH, description="File holding the reverse lookup index (move learners, encounters, types). Leave empty to rebuild it in memory on every start.")
+        metrics_enabled: bool = Field(default=False, description="Record per-call performance metrics (timings, bytes, cache outcomes) in the in-process registry.")
+        emit_performance_status: bool = Field(default=False, description="Show each tool call's timings and cache outcomes as a status message in the chat.")
+        stream_details: bool = Field(default=False, description="Show get_pokemon_details sections in the chat as soon as their data arrives, before the model answers.")
+        rate_limit_per_second: float = Field(default=10.0, description="Upstream requests per second shared by every worker on this machine. 0 disables rate limiting.")
+        rate_limit_burst: int = Field(default=20, description="Upstream requests that may be sent at once before the rate limit applies.")
+        rate_limit_state_path: str = Field(default=DEFAULT_RATE_STATE_PATH, description="File through which worker processes share the rate limit. Leave empty to limit each process separately.")
+        rate_limit_max_wait_seconds: float = Field(default=30.0, description="Longest a tool call waits for an upstream slot before failing.")
+        rate_limit_stale_wait_seconds: float = Field(default=1.0, description="Longest a tool call waits for an upstream slot before answering from an expired cache entry instead.")
+        movelist_max_tokens: int = Field(default=4000, description="Approximate token budget for get_pokemon_movelist output; further version groups are summarized. 0 disables the limit.")
+
     def __init__(self):
         self.citation = True
-        pass
+        self.valves = self.Valves()
+
+    @property
+    def valves(self):
+        return self._valves
 
-    def get_pokemon_details(self, pokemon_name: str):
+    @valves.setter
+    def valves(self, valves):
+        # Open WebUI assigns a fresh Valves instance whenever an admin saves them, so apply settings here
+        self._valves = valves
+        configure_transport(
+            base_url=valves.pokeapi_base_url,
+            connect_timeout=valves.connect_timeout,
+            read_timeout=valves.read_timeout,
+            max_retries=valves.max_retries,
+            backoff_factor=valves.backoff_factor,
+        )
+        configure_cache(
+            enabled=valves.cache_enabled,
+            ttl_seconds=valves.cache_ttl_seconds,
+            max_entries=valves.cache_max_entries,
+            max_memory_bytes=valves.cache_max_memory_mb * 1024 * 1024,
+            disk_path=valves.cache_disk_path,
+            disk_max_bytes=valves.cache_disk_max_mb * 1024 * 1024,
+        )
+        configure_rate_governor(
+            rate=valves.rate_limit_per_second,
+            burst=valves.rate_limit_burst,
+            state_path=valves.rate_limit_state_path,
+            max_wait_seconds=valves.rate_limit_max_wait_seconds,
+            stale_wait_seconds=valves.rate_limit_stale_wait_seconds,
+        )
+        configure_snapshot(path=valves.offline_snapshot_path, offline_only=valves.offline_only)
+        _inverse_index.configure(valves.inverse_index_path)
+        configure_metrics(valves.metrics_enabled)
+
+    @instrumented
+    async def get_pokemon_details(self, pokemon_name: str, include_forms: bool = False, __event_emitter__=None):
         """
         Fetches details of a Pokémon by its name.
         :param pokemon_name: Name of the Pokémon (case-insensitive).
+        :param include_forms: Also fetch the Pokémon's alternate forms (e.g., regional or battle-only forms). Only set this when forms are asked about.
         :return: JSON response containing Pokémon details.
         """
-        formatted_name = format_api_param(pokemon_name)
+        plan = plan_resources("get_pokemon_details", include_forms=include_forms)
+        formatted_name = await resolve_name_async("pokemon", pokemon_name)
         endpoint = f"pokemon/{formatted_name}"
-        raw_data_pokemon = get_pokeapi(endpoint)
+        endpoint_species = f"pokemon-species/{await resolve_name_async('pokemon-species', formatted_name)}"
+        # Sections are rendered as soon as the responses they need arrive and, with the stream_details Valve on,
+        # shown in the chat right away; the whole prompt is still returned at the end
+        stream = __event_emitter__ if self.valves.stream_details else None
+        tasks = [asyncio.ensure_future(get_pokeapi_async(endpoint_species, plan["pokemon-species"]))]
+        try:
+            raw_data_pokemon = await get_pokeapi_async(endpoint, plan["pokemon"])
+            processed_data = process_pokemon(raw_data_pokemon)
 
-        endpoint_species = f"pokemon-species/{formatted_name}"
-        raw_data_species = get_pokeapi(endpoint_species)
+            # Forms only depend on the pokemon/ response, so they load while the species and evolution chain are fetched
+            form_names = processed_data['forms'] if "pokemon-form" in plan else []
+            tasks.append(asyncio.gather(*(run_blocking(get_pokemon_alternate_forms, form_name, plan["pokemon-form"]) for form_name in form_names)))
 
-        # Process and return the relevant Pokémon details
-        processed_data = {
-            "name": raw_data_pokemon.get("name"),
-            "id": raw_data_pokemon.get("id"),
-            "sprite": raw_data_pokemon.get("sprites", {}).get("front_default", "No sprite available"),
-            "sprite_male": raw_data_pokemon.get("sprites", {}).get("front_male") or raw_data_pokemon.get("sprites", {}).get("front_default", "No sprite available"),
-            "sprite_female": raw_data_pokemon.get("sprites", {}).get("front_female") or raw_data_pokemon.get("sprites", {}).get("front_default", "No sprite available"),
-            "sprite_shiny": raw_data_pokemon.get("sprites", {}).get("front_shiny", "No shiny sprite available"),
-            "sprite_shiny_male": raw_data_pokemon.get("sprites", {}).get("front_shiny_male") or raw_data_pokemon.get("sprites", {}).get("front_shiny", "No shiny sprite available"),
-            "sprite_shiny_female": raw_data_pokemon.get("sprites", {}).get("front_shiny_female") or raw_data_pokemon.get("sprites", {}).get("front_shiny", "No shiny sprite available"),
-            "height": f"{raw_data_pokemon.get('height') / 10:.1f} meters",
-            "weight": f"{raw_data_pokemon.get('weight') / 10:.1f} kg",
-            "stats": {stat["stat"]["name"]: stat["base_stat"] for stat in raw_data_pokemon.get("stats", [])},
-            "type": [type_info["type"]["name"] for type_info in raw_data_pokemon.get("types", [])],
-            "abilities": [{"name": ability["ability"]["name"], "hidden": ability.get("is_hidden", False)} for ability in raw_data_pokemon.get("abilities", [])],
-            "is_legendary": raw_data_species.get("is_legendary", False),
-            "is_mythical": raw_data_species.get("is_mythical", False),
-            "is_baby": raw_data_species.get("is_baby", False),
-            "flavor_text_descriptions": {entry["flavor_text"] for entry in raw_data_species.get("flavor_text_entries", []) if entry["language"]["name"] == "en"},
-            "egg_groups": [egg_group["name"] for egg_group in raw_data_species.get("egg_groups", [])],
-            "forms": [forms["name"] for forms in raw_data_pokemon.get("forms", [])] # currently not used, as the api does not provide alternate forms for all Pokémon
-        }
+            # Stats Table
+            stats_table = build_stats_table([(processed_data['name'], processed_data['stats'])])
+            abilities = ", ".join([f"{ability['name']} (Hidden: {ability['hidden']})" for ability in processed_data['abilities']])
+            general_table = (
+                "| Sprite | ID | Type | Abilities | Height | Weight |\n|---|---|---|---|---|---|\n"
+                f"| ![{processed_data['name']} Sprite]({processed_data['sprite']}) | {processed_data['id']} | {', '.join(processed_data['type'])} | "
+                f"{abilities} | {processed_data['height']} | {processed_data['weight']} |"
+            )
+            await emit_message(stream, f"**{processed_data['name'].title()}**\n\n{general_table}\n\n{stats_table}\n\n")
 
-        endpoint_evolution = f"evolution-chain/{raw_data_species.get('evolution_chain', {}).get('url', '').split('/')[-2]}"
-        raw_data_evolution = get_pokeapi(endpoint_evolution)
+            raw_data_species = await tasks[0]
+            processed_data.update(process_species(raw_data_species))
+            tasks.append(asyncio.ensure_future(get_pokeapi_async(raw_data_species.evolution_chain, plan["evolution-chain"])))
+            descriptions = chr(10).join(processed_data['flavor_text_descriptions'])
+            await emit_message(stream, f"{descriptions}\n\n")
 
-        # Process evolution chain
-        processed_evolution_data = {
-            "base_form": raw_data_evolution.get("chain", {}).get("species", {}).get("name", "Unknown"),
-            "evolutions": []
-        }
-        process_evolution_chain(raw_data_evolution.get("chain", {}), processed_evolution_data["evolutions"])
+            # Process evolution chain
+            processed_evolution_data = process_evolution_data(await tasks[2])
+            evolution_text = (
+                f"{processed_evolution_data['base_form']} evolves into {', '.join([evo['name'] for evo in processed_evolution_data['evolutions']])} based on the following conditions:\n"
+                + chr(10).join([f"- {evo['name']} (Trigger: {evo['trigger']}, Min Level: {evo.get('min_level', 'N/A')}, Item: {evo.get('item', 'N/A')}, Time of Day: {evo.get('time_of_day', 'N/A')}, Min Happiness: {evo.get('min_happiness', 'N/A')}, Held Item: {evo.get('held_item', 'N/A')})" for evo in processed_evolution_data['evolutions']])
+            )
+            await emit_message(stream, f"{evolution_text}\n\n")
+
+            forms_info = await tasks[1]
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
 
-        # Process alternate forms - data not used yet.
+        # Process alternate forms, only present when include_forms was requested
         alternate_forms_data = []
-        for form_name in processed_data['forms']:
-            form_info = get_pokemon_alternate_forms(form_name)
+        for form_info in forms_info:
             alternate_forms_data.append({
                 "name": form_info["name"],
                 "is_default": form_info["is_default"],
@@ -173,28 +2783,28 @@ class Tools:
                 "pokemon_type": form_info["pokemon_type"]
             })
 
-        # Stats Table
-        stats_header = "| " + " | ".join([stat_name.replace("-", " ").title() for stat_name in processed_data['stats'].keys()]) + " | Total |"
-        stats_separator = "|" + "---|" * (len(processed_data['stats']) + 1)
-        stats_values = "| " + " | ".join([str(stat_value) for stat_value in processed_data['stats'].values()]) + f" | {sum(processed_data['stats'].values())} |"
+        forms_section = ""
+        if alternate_forms_data:
+            forms_section = "Alternate Forms:\n" + "\n".join([
+                f"- {form['name']} (Type: {', '.join(form['pokemon_type'])}, Default: {'Yes' if form['is_default'] else 'No'}, "
+                f"Battle Only: {'Yes' if form['is_battle_only'] else 'No'}, Mega: {'Yes' if form['is_mega'] else 'No'}): "
+                f"![{form['name']} Sprite]({form['sprites']['front_default']})"
+                for form in alternate_forms_data
+            ]) + "\n"
+            await emit_message(stream, f"{forms_section}\n")
 
         return f"""
 You are a professor who studies Pokémon. Give an analytical description of the Pokémon {processed_data['name']}. Always include the following details:
 General Information:
-| Sprite | ID | Type | Abilities | Height | Weight |
-|---|---|---|---|---|---|
-| ![{processed_data['name']} Sprite]({processed_data['sprite']}) | {processed_data['id']} | {', '.join(processed_data['type'])} | {', '.join([f"{ability['name']} (Hidden: {ability['hidden']})" for ability in processed_data['abilities']])} | {processed_data['height']} | {processed_data['weight']} |
+{general_table}
 
 Stats:
-{stats_header}
-{stats_separator}
-{stats_values}
+{stats_table}
 
-History and Pokémon Descriptions: {chr(10).join(processed_data['flavor_text_descriptions'])} *Note: History and Pokémon descriptions are often poetic and hyperbolic and may not be literal. As a professor in Pokémon studies, you should consider the broader implications of these descriptions.*
+History and Pokémon Descriptions: {descriptions} *Note: History and Pokémon descriptions are often poetic and hyperbolic and may not be literal. As a professor in Pokémon studies, you should consider the broader implications of these descriptions.*
 
 Include the evolution chain of this Pokémon. If specific evolution conditions are known, include them in the description - especially if it requires a specific item, held item, time of day, or happiness level. If the Pokémon has multiple evolutions, list them all:
-{processed_evolution_data['base_form']} evolves into {', '.join([evo['name'] for evo in processed_evolution_data['evolutions']])} based on the following conditions:
-{chr(10).join([f"- {evo['name']} (Trigger: {evo['trigger']}, Min Level: {evo.get('min_level', 'N/A')}, Item: {evo.get('item', 'N/A')}, Time of Day: {evo.get('time_of_day', 'N/A')}, Min Happiness: {evo.get('min_happiness', 'N/A')}, Held Item: {evo.get('held_item', 'N/A')})" for evo in processed_evolution_data['evolutions']])}
+{evolution_text}
 
 Include the additional information about the Pokémon, **only** if it is specifically requested. Otherwise do not include the additional information:
 Sprite (MALE): ![{processed_data['name']} Sprite (MALE)]({processed_data['sprite_male']})
@@ -206,17 +2816,113 @@ Egg Groups Memberships: {', '.join(processed_data['egg_groups'])} *Note: Egg gro
 Legendary Status: {'Yes' if processed_data['is_legendary'] else 'No'} *Note: Only a few Pokémon are classified as legendary. Do not discuss the legendary status of any Pokémon that is not classified as such.*
 Mythical Status: {'Yes' if processed_data['is_mythical'] else 'No'} *Note: Mythical Pokémon are extremely rare and often event-exclusive. Do not discuss the mythical status of any Pokémon that is not classified as such.*
 Baby Status: {'Yes' if processed_data['is_baby'] else 'No'} *Note: Baby Pokémon are often pre-evolutions of other Pokémon and are typically smaller and less powerful. Do not discuss the baby status of any Pokémon that is not classified as such.*
+{forms_section}"""
+    
+    @instrumented
+    async def get_team_details(self, pokemon_names: list[str], __event_emitter__=None):
+        """
+        Fetches details of several Pokémon at once, such as a team of six or a whole evolution family.
+        Shared species data and evolution chains are only looked up once.
+        :param pokemon_names: Names of the Pokémon (case-insensitive), e.g. ["Charmander", "Charmeleon", "Charizard"].
+        :return: Combined description of the Pokémon with a shared stats table.
+        """
+        plan = plan_resources("get_team_details")
+        resolved_names = await asyncio.gather(*(resolve_name_async("pokemon", pokemon_name) for pokemon_name in pokemon_names), return_exceptions=True)
+        formatted_names = list(dict.fromkeys(name for name in resolved_names if not isinstance(name, Exception)))
+        species_names = await asyncio.gather(*(resolve_name_async("pokemon-species", name) for name in formatted_names), return_exceptions=True)
+
+        raw_data = await asyncio.gather(
+            *(get_pokeapi_async(f"pokemon/{name}", plan["pokemon"]) for name in formatted_names),
+            *(get_pokeapi_async(f"pokemon-species/{species_name}", plan["pokemon-species"]) for species_name in species_names
+              if not isinstance(species_name, Exception)),
+            return_exceptions=True,
+        )
+        raw_data_species_list = iter(raw_data[len(formatted_names):])
+        # Per Pokémon, the first failed lookup or its (pokemon, species) data
+        raw_data_team = []
+        for raw_data_pokemon, species_name in zip(raw_data, species_names):
+            raw_data_species = species_name if isinstance(species_name, Exception) else next(raw_data_species_list)
+            raw_data_team.append(next((result for result in (raw_data_pokemon, raw_data_species) if isinstance(result, Exception)),
+                                      (raw_data_pokemon, raw_data_species)))
+        # Lookups that failed for another reason (timeouts, 5xx, rate limit) are reported separately, not as misspellings
+        not_found, failed = sort_lookup_failures(pokemon_names, resolved_names, formatted_names, raw_data_team)
+        team = [
+            (process_pokemon_details(*result), result[1].evolution_chain)
+            for result in raw_data_team if not isinstance(result, Exception)
+        ]
+
+        if not team:
+            if failed:
+                # Nothing to describe and PokeAPI is failing: surface the error instead of blaming the spelling
+                raise failed[0][1]
+            return f"""
+You are a professor who studies Pokémon. None of the requested Pokémon could be found: {'; '.join(not_found)} Ask the user to check the spelling of the names.
 """
+
+        # Team members from the same family share one evolution chain, so each chain is fetched once
+        chain_endpoints = list(dict.fromkeys(endpoint for _, endpoint in team))
+        raw_data_chains = await asyncio.gather(*(get_pokeapi_async(endpoint, plan["evolution-chain"]) for endpoint in chain_endpoints), return_exceptions=True)
+        families = []
+        for endpoint, raw_data_evolution in zip(chain_endpoints, raw_data_chains):
+            if isinstance(raw_data_evolution, Exception):
+                members = ", ".join([f"'{data['name']}'" for data, chain_endpoint in team if chain_endpoint == endpoint])
+                failed.append((f"the evolution family of {members}", raw_data_evolution))
+            else:
+                families.append(process_evolution_data(raw_data_evolution))
+
+        general_rows = []
+        for data, _ in team:
+            abilities = ", ".join([f"{ability['name']} (Hidden: {ability['hidden']})" for ability in data['abilities']])
+            general_rows.append(
+                f"| ![{data['name']} Sprite]({data['sprite']}) | {data['name']} | {data['id']} | {', '.join(data['type'])} | "
+                f"{abilities} | {data['height']} | {data['weight']} | {', '.join(data['egg_groups'])} |"
+            )
+        stats_table = build_stats_table([(data['name'], data['stats']) for data, _ in team], "Pokémon")
+        descriptions = [f"- {data['name']}: {next(iter(data['flavor_text_descriptions']), 'No description available.')}" for data, _ in team]
+        family_lines = []
+        for family in families:
+            family_lines.append(f"- {family['base_form']} evolves into {', '.join([evo['name'] for evo in family['evolutions']]) or 'nothing'}")
+            family_lines.extend([
+                f"  - {evo['name']} (Trigger: {evo['trigger']}, Min Level: {evo.get('min_level', 'N/A')}, Item: {evo.get('item', 'N/A')}, Time of Day: {evo.get('time_of_day', 'N/A')}, Min Happiness: {evo.get('min_happiness', 'N/A')}, Held Item: {evo.get('held_item', 'N/A')})"
+                for evo in family['evolutions']
+            ])
+        special = [
+            f"- {data['name']}: " + ", ".join([status for status, flag in (("Legendary", data['is_legendary']), ("Mythical", data['is_mythical']), ("Baby", data['is_baby'])) if flag])
+            for data, _ in team if data['is_legendary'] or data['is_mythical'] or data['is_baby']
+        ]
+
+        return f"""
+You are a professor who studies Pokémon. Give an analytical description of this group of Pokémon as a whole: {', '.join([data['name'] for data, _ in team])}. Compare them with each other, point out their strengths and weaknesses as a group, and always include the following details:
+General Information:
+| Sprite | Pokémon | ID | Type | Abilities | Height | Weight | Egg Groups |
+|---|---|---|---|---|---|---|---|
+{chr(10).join(general_rows)}
+
+Stats:
+{stats_table}
+
+Evolution Families: If specific evolution conditions are known, include them - especially if they require a specific item, held item, time of day, or happiness level.
+{chr(10).join(family_lines)}
+
+Pokédex Descriptions: *Note: These are often poetic and hyperbolic and may not be literal.*
+{chr(10).join(descriptions)}
+
+Special Status:
+{chr(10).join(special) if special else 'None of these Pokémon are legendary, mythical or baby Pokémon. Do not discuss these statuses.'}
+{f"The following Pokémon could not be found and should be mentioned to the user: {'; '.join(not_found)}" if not_found else ''}
+{f"These could not be loaded from PokeAPI: {', '.join([subject for subject, _ in failed])}. Tell the user that part of the answer is missing and they can try again later." if failed else ''}"""
     
-    def get_ability_details(self, ability_name: str):
+    @instrumented
+    async def get_ability_details(self, ability_name: str, __event_emitter__=None):
         """
         Fetches details of a Pokémon ability by its name.
         :param ability_name: Name of the ability (case-insensitive).
         :return: JSON response containing ability details.
         """
-        formatted_name = format_api_param(ability_name)
+        plan = plan_resources("get_ability_details")
+        formatted_name = await resolve_name_async("ability", ability_name)
         endpoint = f"ability/{formatted_name}"
-        raw_data = get_pokeapi(endpoint)
+        raw_data = await get_pokeapi_async(endpoint, plan["ability"])
 
         # Process and return the relevant ability details
         processed_data = {
@@ -232,15 +2938,17 @@ Effect: {processed_data['effect']}
 Pokémon with this ability: {', '.join(processed_data['pokemon'])}
 """
     
-    def get_pokemon_location(self, pokemon_name: str):
+    @instrumented
+    async def get_pokemon_location(self, pokemon_name: str, __event_emitter__=None):
         """
         Fetches locations where a Pokémon can be found, organized by game version.
         :param pokemon_name: Name of the Pokémon (case-insensitive).
         :return: JSON response containing location details sorted by game version.
         """
-        formatted_name = format_api_param(pokemon_name)
+        plan = plan_resources("get_pokemon_location")
+        formatted_name = await resolve_name_async("pokemon", pokemon_name)
         endpoint = f"pokemon/{formatted_name}/encounters"
-        raw_data = get_pokeapi(endpoint)
+        raw_data = await get_pokeapi_async(endpoint, plan["pokemon-encounters"])
 
         # Group locations by game version
         locations_by_version = {}
@@ -278,15 +2986,17 @@ The Pokémon can be found in these locations across various games:
 Based on this information, describe where players might encounter this Pokémon in the wild. Do not summarize locational data. Offer all locations for every region and game.
 """
 
-    def get_egg_groups(self, egg_group_name: str):
+    @instrumented
+    async def get_egg_groups(self, egg_group_name: str, __event_emitter__=None):
         """
         Fetches details of an egg group by its name.
         :param egg_group_name: Name of the egg group (case-insensitive). Possible values include "monster", "water-1", "field", "ground", etc.
         :return: JSON response containing egg group details.
         """
-        formatted_name = format_api_param(egg_group_name)
+        plan = plan_resources("get_egg_groups")
+        formatted_name = await resolve_name_async("egg-group", egg_group_name)
         endpoint = f"egg-group/{formatted_name}"
-        raw_data = get_pokeapi(endpoint)
+        raw_data = await get_pokeapi_async(endpoint, plan["egg-group"])
 
         # Process and return the relevant egg group details
         processed_data = {
@@ -302,72 +3012,92 @@ Pokémon in this egg group:
 
 """
     
-    def get_pokemon_movelist(self, pokemon_name: str):
+    @instrumented
+    async def get_pokemon_movelist(self, pokemon_name: str, version_group: str = None, learn_method: str = None, generation: str = None, __event_emitter__=None):
         """
         Fetches the movelist of a Pokémon by its name, grouped by version group.
         :param pokemon_name: Name of the Pokémon (case-insensitive).
+        :param version_group: Only include this game or version group (e.g., "emerald", "scarlet-violet"). Set it whenever a specific game is asked about.
+        :param learn_method: Only include moves learned this way (e.g., "level-up", "machine", "egg", "tutor").
+        :param generation: Only include version groups of this generation (e.g., "4", "iv" or "generation-iv").
         :return: Formatted markdown tables of moves organized by version group.
         """
-        formatted_name = format_api_param(pokemon_name)
+        plan = plan_resources("get_pokemon_movelist", generation=generation)
+        formatted_name = await resolve_name_async("pokemon", pokemon_name)
         endpoint = f"pokemon/{formatted_name}"
-        raw_data = get_pokeapi(endpoint)
+        if "generation" in plan:
+            move_table, raw_data_generation = await asyncio.gather(
+                get_pokeapi_async(endpoint, plan["pokemon"]),
+                get_pokeapi_async(generation_endpoint(generation), plan["generation"]),
+            )
+            generation_version_groups = {group["name"] for group in raw_data_generation.get("version_groups", [])}
+        else:
+            move_table = await get_pokeapi_async(endpoint, plan["pokemon"])
+            generation_version_groups = None
+        wanted_method = format_api_param(learn_method) if learn_method else None
+        wanted_version_groups = await run_blocking(version_groups_of, version_group) if version_group else None
 
-        # Group moves by version_group
+        # Group moves by version_group, dropping everything the filters exclude before any rendering
         moves_by_version = {}
-        
-        for move in raw_data.get("moves", []):
-            move_name = move["move"]["name"].replace("-", " ").title()
-            
-            for version_detail in move["version_group_details"]:
-                version_group = version_detail["version_group"]["name"]
-                learn_method = version_detail["move_learn_method"]["name"]
-                level_learned_at = version_detail["level_learned_at"]
-                
-                if version_group not in moves_by_version:
-                    moves_by_version[version_group] = []
-                    
-                moves_by_version[version_group].append({
-                    "name": move_name,
-                    "learn_method": learn_method,
-                    "level_learned_at": level_learned_at
-                })
-        
+        # Whether each version group passes the game and generation filters, decided once per group rather than per row
+        included = {}
+        for version_group_name, method, level, move_name in move_table.rows():
+            keep = included.get(version_group_name)
+            if keep is None:
+                keep = included[version_group_name] = (
+                    (wanted_version_groups is None or version_group_name in wanted_version_groups)
+                    and (generation_version_groups is None or version_group_name in generation_version_groups)
+                )
+            if not keep:
+                continue
+            if wanted_method and method != wanted_method:
+                continue
+
+            if version_group_name not in moves_by_version:
+                moves_by_version[version_group_name] = []
+
+            moves_by_version[version_group_name].append({
+                "name": move_name,
+                "learn_method": method,
+                "level_learned_at": level
+            })
+
         # Format the output as markdown tables by version group
         if not moves_by_version:
+            if version_group or learn_method or generation:
+                return f"""
+No moves match the requested filters for {pokemon_name.title()}. Tell the user, and mention the game versions that do have move data:
+{', '.join(sorted(included)) if included else 'None'}
+"""
             return f"No move data available for {pokemon_name}."
-        
-        # Create markdown tables for each version group
-        markdown_tables = []
-        for version_group, moves in sorted(moves_by_version.items()):
-            # Sort moves: first by learn method, then by level (if applicable), then by name
-            moves.sort(key=lambda x: (x["learn_method"], x["level_learned_at"] if x["level_learned_at"] else 0, x["name"]))
-            
-            table = f"### {version_group.replace('-', ' ').title()}\n\n"
-            table += "| Move | Learn Method | Level |\n"
-            table += "|------|-------------|-------|\n"
-            
-            for move in moves:
-                level = str(move["level_learned_at"]) if move["level_learned_at"] else "N/A"
-                table += f"| {move['name']} | {move['learn_method'].replace('-', ' ').title()} | {level} |\n"
-            
-            markdown_tables.append(table)
-        
+
+        markdown_tables, summaries = render_movelist(moves_by_version, self.valves.movelist_max_tokens * CHARS_PER_TOKEN)
+
+        summary_section = ""
+        if summaries:
+            summary_section = (
+                "\nThe following version groups were summarized to keep this response short. If the user asks about one of them, "
+                "call this tool again with its version_group:\n" + "\n".join(summaries) + "\n"
+            )
+
         return f"""
 Provide information about the moves that {pokemon_name.title()} can learn across different game versions. If there is a specific game version asked about, include only the moves available in that version. If no game version is specified, provide all moves across all versions.
 {chr(10).join(markdown_tables)}
-
+{summary_section}
 """
 
 
-    def get_item(self, item_name: str):
+    @instrumented
+    async def get_item(self, item_name: str, __event_emitter__=None):
         """
         Fetches details of an item by its name.
         :param item_name: Name of the item (case-insensitive).
         :return: JSON response containing item details.
         """
-        formatted_name = format_api_param(item_name)
+        plan = plan_resources("get_item")
+        formatted_name = await resolve_name_async("item", item_name)
         endpoint = f"item/{formatted_name}"
-        raw_data = get_pokeapi(endpoint)
+        raw_data = await get_pokeapi_async(endpoint, plan["item"])
 
         # Process and return the relevant item details
         processed_data = {
@@ -417,4 +3147,286 @@ Attributes: {', '.join(processed_data['attributes']) if processed_data['attribut
 *Note: The following information is optional and should only be included if specifically requested. Otherwise, do not include this information.*
 Held By Pokémon: {', '.join([f"{held['pokemon']} (Rarity: {held['version_details'][0]['rarity']}, Version: {held['version_details'][0]['version']})" for held in processed_data['held_by_pokemon']]) if processed_data['held_by_pokemon'] else 'No Pokémon hold this item.'}
 Baby Trigger For: {processed_data['baby_trigger_for'] if processed_data['baby_trigger_for'] else 'N/A'} *Note: This indicates if the item is used to trigger the baby form of a Pokémon.*
-"""
\ No newline at end of file
+"""
+
+    @instrumented
+    async def get_move_learners(self, move_name: str, version_group: str = None, __event_emitter__=None):
+        """
+        Finds every Pokémon that can learn a move, optionally in a specific game.
+        :param move_name: Name of the move (case-insensitive), e.g. "Trick Room".
+        :param version_group: Only include this game or version group (e.g., "scarlet-violet", "emerald"). Set it whenever a specific game is asked about.
+        :return: Table of the Pokémon that learn the move, with learn method and level.
+        """
+        if not await run_blocking(_inverse_index.ensure):
+            return inverse_index_pending_message()
+        move = await resolve_name_async("move", move_name)
+        version_groups = await run_blocking(version_groups_of, version_group) if version_group else None
+        if version_groups is not None and not _inverse_index.find_version_groups(version_groups):
+            return f"""
+You are a Pokémon move expert. The game or version group "{version_group}" is unknown. Tell the user, and mention the version groups that have move data:
+{', '.join(_inverse_index.version_groups.names)}
+"""
+        learners = _inverse_index.move_learners(move, version_groups)
+        game = f" in {version_group}" if version_group else ""
+        if not learners:
+            return f"""
+You are a Pokémon move expert. No Pokémon can learn the move {move.replace('-', ' ').title()}{game} according to the database. Tell the user.
+"""
+
+        rows = []
+        for pokemon, details in sorted(learners.items()):
+            methods = sorted({f"{method.replace('-', ' ').title()}{f' (Lv. {level})' if level else ''}" for _, method, level in details})
+            version_groups = sorted({version_group_name for version_group_name, _, _ in details})
+            rows.append(f"| {pokemon} | {', '.join(methods)} | {', '.join(version_groups) if version_group else len(version_groups)} |")
+
+        return f"""
+You are a Pokémon move expert. These {len(learners)} Pokémon can learn the move {move.replace('-', ' ').title()}{game}. Present the full list, grouped by learn method where helpful:
+| Pokémon | Learn Method | {'Version Groups' if version_group else 'Number of Version Groups'} |
+|---|---|---|
+{chr(10).join(rows)}
+"""
+
+    @instrumented
+    async def get_location_encounters(self, location_name: str, version: str = None, __event_emitter__=None):
+        """
+        Finds every Pokémon that can be encountered in the wild at a location, optionally in a specific game.
+        :param location_name: Name of the location or location area (case-insensitive), e.g. "Route 119".
+        :param version: Only include this game version (e.g., "emerald", "red"). Set it whenever a specific game is asked about.
+        :return: Tables of encounters per location area and game version.
+        """
+        if not await run_blocking(_inverse_index.ensure):
+            return inverse_index_pending_message()
+        areas = _inverse_index.find_areas(location_name)
+        encounters = _inverse_index.location_encounters(areas, version)
+        game = f" in Pokémon {version.title()}" if version else ""
+        if not encounters:
+            return f"""
+You are a Pokémon researcher. No wild Pokémon encounters are recorded at {location_name}{game} in the database. Tell the user, and suggest checking the location name or game.
+"""
+
+        sections = []
+        for (area, version_name), rows in sorted(encounters.items()):
+            lines = [f"### {area.replace('-', ' ').title()} ({version_name.title()})", "", "| Pokémon | Method | Levels | Chance |", "|---|---|---|---|"]
+            for pokemon, method, low, high, chance in sorted(rows, key=lambda row: (row[1], -row[4], row[0])):
+                levels = str(low) if low == high else f"{low}-{high}"
+                lines.append(f"| {pokemon} | {method.replace('-', ' ').title()} | {levels} | {chance}% |")
+            sections.append("\n".join(lines))
+
+        return f"""
+You are a Pokémon researcher. Describe which Pokémon can be found at {location_name}{game}. Do not summarize the encounter data; include every Pokémon, method and game listed:
+
+{chr(10).join(sections)}
+"""
+
+    @instrumented
+    async def get_pokemon_by_type(self, type_name: str, __event_emitter__=None):
+        """
+        Lists every Pokémon that has a type.
+        :param type_name: Name of the type (case-insensitive), e.g. "fairy".
+        :return: List of Pokémon with the type.
+        """
+        if not await run_blocking(_inverse_index.ensure):
+            return inverse_index_pending_message()
+        pokemon = _inverse_index.pokemon_of_type(type_name)
+        if not pokemon:
+            return f"""
+You are a Pokémon expert. No Pokémon of the type {type_name} were found in the database. Tell the user, and mention that there are 18 types.
+"""
+        return f"""
+You are a Pokémon expert. These {len(pokemon)} Pokémon have the {format_api_param(type_name)} type (as either their primary or secondary type):
+{', '.join(pokemon)}
+"""
+
+    @instrumented
+    async def get_type_matchups(self, type_names: list[str], __event_emitter__=None):
+        """
+        Finds the weaknesses, resistances and immunities of a type or dual-type combination, and what its types' moves are strong against.
+        :param type_names: One or two types (case-insensitive), e.g. ["Fire", "Flying"].
+        :return: Damage multipliers the combination takes from every attacking type.
+        """
+        chart = await load_type_chart()
+        resolved = await asyncio.gather(*(resolve_name_async("type", type_name) for type_name in type_names[:2]), return_exceptions=True)
+        types = list(dict.fromkeys(name for name in resolved if not isinstance(name, Exception) and name in chart.ids))
+        if not types or any(isinstance(name, Exception) or name not in chart.ids for name in resolved):
+            return f"""
+You are a Pokémon type expert. The type combination {' / '.join(type_names)} could not be found. Tell the user, and mention that the types are: {', '.join(chart.names)}.
+"""
+
+        defense = chart.defense(*chart.pair(types))
+        taken = [
+            f"- {format_multiplier(multiplier)} damage from: {', '.join([chart.names[type_id] for type_id in np.flatnonzero(defense == multiplier)])}"
+            for multiplier in sorted(set(defense.tolist()), reverse=True)
+        ]
+        dealt = []
+        for name in types:
+            row = chart.matrix[chart.ids[name], :-1]
+            groups = [
+                f"{label}: {', '.join([chart.names[type_id] for type_id in np.flatnonzero(row == multiplier)]) or 'none'}"
+                for label, multiplier in (("super effective against", 2.0), ("not very effective against", 0.5), ("no effect on", 0.0))
+            ]
+            dealt.append(f"- {name} moves are {'; '.join(groups)}")
+
+        return f"""
+You are a Pokémon type expert. Explain the matchups of the {' / '.join(types)} type combination below, starting with its weaknesses.
+Damage taken from each attacking type:
+{chr(10).join(taken)}
+
+Damage dealt by moves of its types to single-typed Pokémon:
+{chr(10).join(dealt)}
+"""
+
+    @instrumented
+    async def get_movepool_coverage(self, move_names: list[str], __event_emitter__=None):
+        """
+        Finds which types and Pokémon a set of moves hits super effectively, and which resist or are immune to all of them.
+        :param move_names: Names of the moves (case-insensitive), e.g. ["Thunderbolt", "Ice Beam", "Surf"].
+        :return: Offensive type coverage of the moves.
+        """
+        plan = plan_resources("get_movepool_coverage")
+        chart = await load_type_chart()
+        requested = move_names
+        resolved = await asyncio.gather(*(resolve_name_async("move", move_name) for move_name in move_names), return_exceptions=True)
+        names = list(dict.fromkeys(name for name in resolved if not isinstance(name, Exception)))
+        raw_data = await asyncio.gather(*(get_pokeapi_async(f"move/{name}", plan["move"]) for name in names), return_exceptions=True)
+        not_found, failed = sort_lookup_failures(requested, resolved, names, raw_data)
+        moves = [data for data in raw_data if not isinstance(data, Exception)]
+        # Status moves deal no damage, so only damaging moves of a type in the chart count towards coverage
+        damaging = [move for move in moves if (move.get("damage_class") or {}).get("name") != "status" and move["type"]["name"] in chart.ids]
+        status = [move["name"] for move in moves if move not in damaging]
+        if not damaging:
+            if failed:
+                raise failed[0][1]
+            return f"""
+You are a Pokémon battle expert. None of the moves {', '.join(move_names)} deal damage{f" (not found: {'; '.join(not_found)})" if not_found else ''}, so they have no type coverage. Tell the user.
+"""
+
+        attacking = np.array(sorted({chart.ids[move["type"]["name"]] for move in damaging}))
+        single_types = np.arange(len(chart.names))
+        best = chart.offense(attacking, single_types, np.full(len(chart.names), chart.none))
+        coverage = [
+            f"- {label}: {', '.join([chart.names[type_id] for type_id in np.flatnonzero(best == multiplier)]) or 'none'}"
+            for label, multiplier in (("Super effective against", 2.0), ("Neutral against", 1.0), ("Resisted by", 0.5), ("No effect on", 0.0))
+        ]
+
+        pokemon_section = ""
+        if await run_blocking(_inverse_index.ensure):
+            pokemon_names, first, second = chart.pokemon(_inverse_index)
+            best = chart.offense(attacking, first, second)
+            counts = ", ".join([f"{int((best == multiplier).sum())} take {format_multiplier(multiplier)}" for multiplier in sorted(set(best.tolist()), reverse=True)])
+            walls = np.flatnonzero(best < 1)
+            walls = walls[np.argsort(best[walls], kind="stable")][:30]
+            pokemon_section = f"""
+Against all {len(pokemon_names)} Pokémon (best multiplier of any move, including dual types): {counts}.
+Pokémon that resist or are immune to every move{' (first 30)' if (best < 1).sum() > 30 else ''}: {', '.join([f"{pokemon_names[index]} ({format_multiplier(best[index])})" for index in walls]) or 'none'}
+"""
+
+        move_lines = [f"- {move['name']}: {move['type']['name']} ({(move.get('damage_class') or {}).get('name', 'unknown')})" for move in damaging]
+        return f"""
+You are a Pokémon battle expert. Explain the offensive type coverage of this movepool, pointing out the gaps.
+Damaging moves:
+{chr(10).join(move_lines)}
+{f"Status moves (no coverage): {', '.join(status)}" if status else ''}
+{f"Not found: {'; '.join(not_found)}" if not_found else ''}
+{f"Could not be loaded from PokeAPI (tell the user they can try again later): {', '.join([name for name, _ in failed])}" if failed else ''}
+Best multiplier against single-typed Pokémon:
+{chr(10).join(coverage)}
+{pokemon_section}"""
+
+    @instrumented
+    async def get_team_coverage(self, pokemon_names: list[str], threats: int = 10, __event_emitter__=None):
+        """
+        Summarizes a team's shared weaknesses, resistances and same-type attack coverage, and ranks the Pokémon whose types match up best against it.
+        :param pokemon_names: Names of the team's Pokémon (case-insensitive), e.g. ["Charizard", "Blastoise", "Venusaur"].
+        :param threats: Number of threatening Pokémon to list.
+        :return: Team type coverage tables and the top threats.
+        """
+        plan = plan_resources("get_team_coverage")
+        chart = await load_type_chart()
+        requested = pokemon_names
+        resolved = await asyncio.gather(*(resolve_name_async("pokemon", pokemon_name) for pokemon_name in pokemon_names), return_exceptions=True)
+        names = list(dict.fromkeys(name for name in resolved if not isinstance(name, Exception)))
+        raw_data = await asyncio.gather(*(get_pokeapi_async(f"pokemon/{name}", plan["pokemon"]) for name in names), return_exceptions=True)
+        not_found, failed = sort_lookup_failures(requested, resolved, names, raw_data)
+        team = [data for data in raw_data if not isinstance(data, Exception) and any(name in chart.ids for name in data.types)]
+        if not team:
+            if failed:
+                raise failed[0][1]
+            return f"""
+You are a Pokémon battle expert. None of the requested Pokémon could be found: {'; '.join(not_found)} Ask the user to check the spelling of the names.
+"""
+
+        pairs = np.array([chart.pair([name for name in data.types if name in chart.ids]) for data in team])
+        team_first, team_second = pairs[:, 0], pairs[:, 1]
+        defense = chart.defense(team_first, team_second)
+        weak = (defense > 1).sum(axis=0)
+        resist = (defense < 1).sum(axis=0)
+        rows = [
+            f"| {name} | {' | '.join([format_multiplier(multiplier) for multiplier in defense[:, type_id]])} | {weak[type_id]} | {resist[type_id]} |"
+            for type_id, name in enumerate(chart.names)
+        ]
+        uncovered = [chart.names[type_id] for type_id in np.flatnonzero((weak > 0) & (resist == 0))]
+
+        stab = np.unique(np.concatenate([team_first, team_second[team_second != chart.none]]))
+        best = chart.offense(stab, np.arange(len(chart.names)), np.full(len(chart.names), chart.none))
+        super_effective = [chart.names[type_id] for type_id in np.flatnonzero(best > 1)]
+        unanswered = [chart.names[type_id] for type_id in np.flatnonzero(best < 1)]
+
+        threat_section = "\nThe reverse lookup index is still being built, so threatening Pokémon cannot be ranked yet.\n"
+        if await run_blocking(_inverse_index.ensure):
+            candidate_names, first, second = chart.pokemon(_inverse_index)
+            scores = chart.rank_against(team_first, team_second, first, second)
+            scores[np.isin(candidate_names, [data.name for data in team])] = -np.inf
+            top = np.argsort(-scores, kind="stable")[:max(threats, 0)]
+            threat_lines = [
+                f"- {candidate_names[index]} ({'/'.join([chart.names[type_id] for type_id in (first[index], second[index]) if type_id != chart.none])}): score {scores[index]:+.2f}"
+                for index in top if np.isfinite(scores[index])
+            ]
+            threat_section = f"""
+Pokémon whose types match up best against this team (same-type attacks on both sides; score is the mean log2 advantage per team member, higher is more threatening):
+{chr(10).join(threat_lines)}
+"""
+
+        return f"""
+You are a Pokémon battle expert. Summarize this team's type matchups: its shared weaknesses, what it resists, the gaps in its same-type attack coverage and the Pokémon that threaten it.
+{f"Not found: {'; '.join(not_found)}" if not_found else ''}
+{f"Could not be loaded from PokeAPI (tell the user they can try again later): {', '.join([name for name, _ in failed])}" if failed else ''}
+Damage each team member takes from every attacking type:
+| Attacking Type | {' | '.join([f"{data.name} ({'/'.join(data.types)})" for data in team])} | Weak | Resist |
+|---|{'---|' * len(team)}---|---|
+{chr(10).join(rows)}
+
+Weaknesses no team member resists: {', '.join(uncovered) or 'none'}
+Types the team's same-type attacks hit super effectively: {', '.join(super_effective) or 'none'}
+Types that resist all of the team's same-type attacks: {', '.join(unanswered) or 'none'}
+{threat_section}"""
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="PokéProfGPT maintenance commands.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Build or update an offline snapshot from the PokeAPI api-data dump.")
+    ingest.add_argument("source", help="Checkout of https://github.com/PokeAPI/api-data")
+    ingest.add_argument("snapshot", help="SQLite snapshot file to create or update")
+    ingest.add_argument("--version", help="Version stamp to record (default: ingest time)")
+    ingest.add_argument("--resources", nargs="+", default=list(SNAPSHOT_RESOURCES), help="Resource directories to include")
+
+    index = commands.add_parser("build-index", help="Build or update the reverse lookup index (move learners, encounters, types).")
+    index.add_argument("index", help="Index file to create or update")
+    index.add_argument("--snapshot", help="Offline snapshot to build from instead of the network")
+    index.add_argument("--refresh", nargs="+", default=[], help="Pokémon whose entries should be rebuilt")
+
+    args = parser.parse_args()
+    if args.command == "build-index":
+        if args.snapshot:
+            configure_snapshot(path=args.snapshot)
+        _inverse_index.configure(args.index)
+        started = time.perf_counter()
+        build_inverse_index(refresh=args.refresh)
+        print(f"{args.index}: {_inverse_index.progress} in {time.perf_counter() - started:.1f}s")
+    elif args.command == "ingest":
+        started = time.perf_counter()
+        counts = ingest_api_data(args.source, args.snapshot, args.version, tuple(args.resources))
+        print(f"{args.snapshot}: {counts} in {time.perf_counter() - started:.1f}s")